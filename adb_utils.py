@@ -0,0 +1,21 @@
+#!/usr/bin/env python3
+"""
+ADB Utilities Module
+
+Helpers for parsing adb output, shared by the scripts in this repository.
+Standard library only.
+"""
+
+import re
+
+
+# A ready device in `adb devices` output: "<serial>\tdevice"
+ADB_DEVICE_RE = re.compile(r'^(\S+)\tdevice\r?$', re.M)
+
+
+def parse_adb_devices(stdout):
+    """Return the serials of ready devices from `adb devices` output.
+
+    Devices that are offline or unauthorized are skipped.
+    """
+    return ADB_DEVICE_RE.findall(stdout)
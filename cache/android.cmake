@@ -0,0 +1,6 @@
+# CMake initial cache for box64 Android cross-builds (all ABIs).
+# Loaded with 'cmake -C' so known answers skip the matching try_compile probes.
+
+# The NDK clang driver is known to work; skip the per-language sanity compile.
+set(CMAKE_C_COMPILER_WORKS TRUE CACHE INTERNAL "")
+set(CMAKE_CXX_COMPILER_WORKS TRUE CACHE INTERNAL "")
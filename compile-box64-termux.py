@@ -26,16 +26,22 @@ Examples:
 
 import os
 import sys
+import shlex
 import subprocess
 import shutil
 import platform
+import re
 import argparse
+import functools
+import hashlib
 import logging
 import tempfile
+import types
 import urllib.request
 import tarfile
+from collections import deque
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Mapping, NamedTuple, Optional, Tuple, Union
 
 # Configure logging
 logging.basicConfig(
@@ -44,9 +50,79 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+class CommandResult(NamedTuple):
+    """Exit status and output tail of a streamed command."""
+    returncode: int
+    stderr: str  # last lines of combined stdout/stderr, for error reporting
+
+def _cpu_tuning_args(flags: str) -> Tuple[str, ...]:
+    """CMake arguments adding CPU tuning flags for C and C++ in every build type."""
+    return (f'-DCMAKE_C_FLAGS={flags}', f'-DCMAKE_CXX_FLAGS={flags}')
+
+
+# Termux-specific platform configurations, shared by all builder instances
+_PLATFORM_CONFIGS: Mapping[str, dict] = types.MappingProxyType({
+    # Snapdragon platforms (most common on Android)
+    'snapdragon-845': {
+        'cmake_args': ('-DSD845=ON', *_cpu_tuning_args('-march=armv8.2-a -mtune=cortex-a75')),
+        'description': 'Snapdragon 845 (Android)'
+    },
+    'snapdragon-855': {
+        'cmake_args': ('-DSD855=ON', *_cpu_tuning_args('-march=armv8.2-a -mtune=cortex-a76')),
+        'description': 'Snapdragon 855 (Android)'
+    },
+    'snapdragon-865': {
+        'cmake_args': ('-DSD865=ON', *_cpu_tuning_args('-march=armv8.2-a -mtune=cortex-a77')),
+        'description': 'Snapdragon 865 (Android)'
+    },
+    'snapdragon-888': {
+        'cmake_args': ('-DSD888=ON', *_cpu_tuning_args('-march=armv8.2-a -mtune=cortex-x1')),
+        'description': 'Snapdragon 888 (Android)'
+    },
+    'snapdragon-8gen1': {
+        'cmake_args': ('-DSD8G1=ON', *_cpu_tuning_args('-march=armv9-a -mtune=cortex-x2')),
+        'description': 'Snapdragon 8 Gen 1 (Android)'
+    },
+    'snapdragon-8gen2': {
+        'cmake_args': ('-DSD8G2=ON', *_cpu_tuning_args('-march=armv9-a -mtune=cortex-x3')),
+        'description': 'Snapdragon 8 Gen 2 (Android)'
+    },
+    'snapdragon-8gen3': {
+        'cmake_args': ('-DSD8G3=ON', *_cpu_tuning_args('-march=armv9-a -mtune=cortex-x4')),
+        'description': 'Snapdragon 8 Gen 3 (Android)'
+    },
+    
+    # Other ARM64 platforms
+    'generic-arm64': {
+        'cmake_args': ('-DARM64=ON',),
+        'description': 'Generic ARM64 (Android)'
+    },
+    'termux': {
+        'cmake_args': ('-DTERMUX=ON', '-DCMAKE_C_COMPILER=clang'),
+        'description': 'Termux (Android)'
+    },
+    'android': {
+        'cmake_args': ('-DANDROID=ON', '-DBAD_SIGNAL=ON'),
+        'description': 'Android'
+    }
+})
+
 class TermuxBox64Builder:
     """Box64 builder specifically designed for Termux on Android."""
     
+    # Snapdragon model markers in /proc/cpuinfo; the first one found wins, and the word
+    # boundaries keep e.g. "855" from matching inside a longer number
+    _SD_RE = re.compile(r'\b(8 gen 3|8 gen 2|8 gen 1|888|865|855|845)\b')
+    _SD_MAP = {
+        '8 gen 3': 'snapdragon-8gen3',
+        '8 gen 2': 'snapdragon-8gen2',
+        '8 gen 1': 'snapdragon-8gen1',
+        '888': 'snapdragon-888',
+        '865': 'snapdragon-865',
+        '855': 'snapdragon-855',
+        '845': 'snapdragon-845',
+    }
+    
     def __init__(self, source_dir: str = None, build_dir: str = None):
         self.script_dir = Path(__file__).parent.resolve()
         
@@ -66,56 +142,13 @@ class TermuxBox64Builder:
         self.host_system = platform.system().lower()
         
         # Build configuration
-        self.cmake_args = []
-        self.make_args = []
         self.install_prefix = "/data/data/com.termux/files/usr/local"
+        self.source_ref = None  # branch or tag to clone (default: upstream HEAD)
+        self.build_type = "Release"
+        self.build_env = None  # environment for configure/build commands (None: inherit)
         
         # Termux-specific platform configurations
-        self.platform_configs = {
-            # Snapdragon platforms (most common on Android)
-            'snapdragon-845': {
-                'cmake_args': ['-DSD845=ON', '-DCMAKE_BUILD_TYPE=RelWithDebInfo'],
-                'description': 'Snapdragon 845 (Android)'
-            },
-            'snapdragon-855': {
-                'cmake_args': ['-DSD855=ON', '-DCMAKE_BUILD_TYPE=RelWithDebInfo'],
-                'description': 'Snapdragon 855 (Android)'
-            },
-            'snapdragon-865': {
-                'cmake_args': ['-DSD865=ON', '-DCMAKE_BUILD_TYPE=RelWithDebInfo'],
-                'description': 'Snapdragon 865 (Android)'
-            },
-            'snapdragon-888': {
-                'cmake_args': ['-DSD888=ON', '-DCMAKE_BUILD_TYPE=RelWithDebInfo'],
-                'description': 'Snapdragon 888 (Android)'
-            },
-            'snapdragon-8gen1': {
-                'cmake_args': ['-DSD8G1=ON', '-DCMAKE_BUILD_TYPE=RelWithDebInfo'],
-                'description': 'Snapdragon 8 Gen 1 (Android)'
-            },
-            'snapdragon-8gen2': {
-                'cmake_args': ['-DSD8G2=ON', '-DCMAKE_BUILD_TYPE=RelWithDebInfo'],
-                'description': 'Snapdragon 8 Gen 2 (Android)'
-            },
-            'snapdragon-8gen3': {
-                'cmake_args': ['-DSD8G3=ON', '-DCMAKE_BUILD_TYPE=RelWithDebInfo'],
-                'description': 'Snapdragon 8 Gen 3 (Android)'
-            },
-            
-            # Other ARM64 platforms
-            'generic-arm64': {
-                'cmake_args': ['-DARM64=ON', '-DCMAKE_BUILD_TYPE=RelWithDebInfo'],
-                'description': 'Generic ARM64 (Android)'
-            },
-            'termux': {
-                'cmake_args': ['-DTERMUX=ON', '-DCMAKE_C_COMPILER=clang', '-DCMAKE_BUILD_TYPE=RelWithDebInfo'],
-                'description': 'Termux (Android)'
-            },
-            'android': {
-                'cmake_args': ['-DANDROID=ON', '-DBAD_SIGNAL=ON', '-DCMAKE_BUILD_TYPE=RelWithDebInfo'],
-                'description': 'Android'
-            }
-        }
+        self.platform_configs = _PLATFORM_CONFIGS
     
     def check_termux_environment(self) -> bool:
         """Check if running in Termux environment."""
@@ -161,87 +194,112 @@ class TermuxBox64Builder:
         logger.info("Using Termux configuration")
         return 'termux'
     
-    def _is_snapdragon(self) -> bool:
-        """Check if running on Snapdragon SoC."""
+    @functools.cached_property
+    def _cpuinfo(self) -> str:
+        """Lowercased contents of /proc/cpuinfo, read once."""
         try:
-            # Check CPU info
-            with open('/proc/cpuinfo', 'r') as f:
-                cpuinfo = f.read()
-                return 'qualcomm' in cpuinfo.lower() or 'snapdragon' in cpuinfo.lower()
-        except:
-            pass
-        
-        # Check device model
+            return Path('/proc/cpuinfo').read_text().lower()
+        except OSError:
+            return ''
+    
+    @functools.cached_property
+    def _device_model(self) -> str:
+        """Lowercased contents of /proc/device-tree/model, read once."""
         try:
-            with open('/proc/device-tree/model', 'r') as f:
-                model = f.read().lower()
-                return 'snapdragon' in model or 'qualcomm' in model
-        except:
-            pass
-        
+            return Path('/proc/device-tree/model').read_text().lower()
+        except OSError:
+            return ''
+    
+    def _is_snapdragon(self) -> bool:
+        """Check if running on Snapdragon SoC."""
+        # Check CPU info, then device model
+        for text in (self._cpuinfo, self._device_model):
+            if 'qualcomm' in text or 'snapdragon' in text:
+                return True
         return False
     
     def _get_snapdragon_model(self) -> Optional[str]:
         """Get Snapdragon model."""
-        try:
-            with open('/proc/cpuinfo', 'r') as f:
-                cpuinfo = f.read()
-                
-                # Check for specific Snapdragon models
-                if '845' in cpuinfo:
-                    return 'snapdragon-845'
-                elif '855' in cpuinfo:
-                    return 'snapdragon-855'
-                elif '865' in cpuinfo:
-                    return 'snapdragon-865'
-                elif '888' in cpuinfo:
-                    return 'snapdragon-888'
-                elif '8 gen 1' in cpuinfo.lower():
-                    return 'snapdragon-8gen1'
-                elif '8 gen 2' in cpuinfo.lower():
-                    return 'snapdragon-8gen2'
-                elif '8 gen 3' in cpuinfo.lower():
-                    return 'snapdragon-8gen3'
-        except:
-            pass
-        
-        return None
+        match = self._SD_RE.search(self._cpuinfo)
+        return self._SD_MAP[match.group(1)] if match else None
     
-    def install_termux_dependencies(self) -> bool:
+    def install_termux_dependencies(self, force: bool = False) -> bool:
         """Install required dependencies in Termux."""
         logger.info("Installing Termux dependencies...")
         
-        # Update package lists
-        logger.info("Updating package lists...")
-        success, result = self._run_command("pkg update -y")
-        if not success:
-            logger.error("Failed to update package lists")
-            return False
-        
-        # Install essential packages
+        # Essential packages
         packages = [
             "git", "wget", "curl", "unzip", "tar", "python", "python-pip",
-            "build-essential", "cmake", "pkg-config", "clang", "make",
-            "libc6-dev", "libstdc++", "zlib", "libffi", "openssl"
+            "build-essential", "cmake", "ninja", "ccache", "pkg-config", "clang", "make",
+            "ndk-sysroot", "libc++", "zlib", "libffi", "openssl"
         ]
+        python_packages = ["setuptools", "wheel"]
+        
+        # Skip the whole apt/pip round trip if this package set was already installed
+        digest = hashlib.sha256(repr((sorted(packages), sorted(python_packages))).encode()).hexdigest()
+        sentinel = Path.home() / f".box64-deps-{digest[:16]}"
+        if sentinel.exists() and not force:
+            logger.info(f"Dependencies already installed (sentinel: {sentinel})")
+            return True
         
-        for package in packages:
-            logger.info(f"Installing {package}...")
-            success, result = self._run_command(f"pkg install -y {package}")
+        # Only install what is actually missing
+        installed = self._get_installed_packages()
+        missing = [p for p in packages if p not in installed]
+        all_installed = True
+        
+        if not missing:
+            logger.info("All Termux packages already installed")
+        else:
+            # Update package lists
+            logger.info("Updating package lists...")
+            success, result = self._run_command(['pkg', 'update', '-y'])
             if not success:
-                logger.warning(f"Failed to install {package}: {result.stderr if result else 'Unknown error'}")
+                logger.error("Failed to update package lists")
+                return False
+            
+            # Install everything in one transaction so apt resolves dependencies once
+            logger.info(f"Installing {len(missing)} missing packages: {' '.join(missing)}")
+            env = dict(os.environ, DEBIAN_FRONTEND='noninteractive')
+            all_installed, result = self._run_command(['pkg', 'install', '-y', *missing], env=env)
+            if not all_installed:
+                # Fall back to a per-package pass to report which packages failed
+                logger.warning("Batched install failed, retrying package by package...")
+                all_installed = True
+                for package in missing:
+                    success, result = self._run_command(['pkg', 'install', '-y', package], env=env)
+                    if not success:
+                        all_installed = False
+                        logger.warning(f"Failed to install {package}: {result.stderr if result else 'Unknown error'}")
         
         # Install Python packages
-        python_packages = ["setuptools", "wheel"]
-        for package in python_packages:
-            logger.info(f"Installing Python package {package}...")
-            success, result = self._run_command(f"pip install {package}")
-            if not success:
-                logger.warning(f"Failed to install Python package {package}")
+        logger.info(f"Installing Python packages: {', '.join(python_packages)}...")
+        success, result = self._run_command(['pip', 'install', *python_packages])
+        if not success:
+            all_installed = False
+            logger.warning(f"Failed to install Python packages: {result.stderr if result else 'Unknown error'}")
+        
+        # Only record completion when nothing failed, so a partial install is retried next time
+        if all_installed:
+            sentinel.touch()
         
         logger.info("Dependencies installation completed")
         return True
     
+    def _get_installed_packages(self) -> set:
+        """Get the names of installed dpkg packages with a single `dpkg -l` call."""
+        try:
+            result = subprocess.run(['dpkg', '-l'], capture_output=True, text=True)
+        except OSError as e:
+            logger.debug(f"Failed to query installed packages: {e}")
+            return set()
+        
+        installed = set()
+        for line in result.stdout.splitlines():
+            fields = line.split()
+            if len(fields) >= 2 and fields[0] == 'ii':
+                installed.add(fields[1].split(':', 1)[0])
+        return installed
+    
     def clone_box64_source(self) -> bool:
         """Clone box64 source code."""
         if self.source_dir.exists():
@@ -254,13 +312,19 @@ class TermuxBox64Builder:
         self.source_dir.mkdir(parents=True, exist_ok=True)
         
         # Clone repository
+        # Shallow, partial clone: a build only needs the tip tree
         clone_cmd = [
-            'git', 'clone', 
+            'git', 'clone',
+            '--depth=1', '--single-branch', '--filter=blob:none',
+        ]
+        if self.source_ref:
+            clone_cmd.extend(['--branch', self.source_ref])
+        clone_cmd.extend([
             'https://github.com/ptitSeb/box64.git',
             str(self.source_dir)
-        ]
+        ])
         
-        success, result = self._run_command(' '.join(clone_cmd))
+        success, result = self._run_command(clone_cmd)
         if not success:
             logger.error(f"Failed to clone box64 repository: {result.stderr if result else 'Unknown error'}")
             return False
@@ -296,27 +360,43 @@ class TermuxBox64Builder:
         # Base CMake command
         cmake_cmd = ['cmake', str(self.source_dir)]
         
+        # Default to Ninja (its flat build graph is much cheaper than make on phone storage),
+        # unless a generator was chosen via CMAKE_GENERATOR or the custom arguments. An
+        # existing build tree keeps its generator: CMake refuses to switch without --clean.
+        custom_args = custom_args or []
+        if ('CMAKE_GENERATOR' not in os.environ and not any(arg.startswith('-G') for arg in custom_args)
+                and shutil.which('ninja') and not (self.build_dir / 'CMakeCache.txt').exists()):
+            cmake_cmd.extend(['-G', 'Ninja'])
+        
         # Add platform-specific arguments
-        self.cmake_args.extend(config['cmake_args'])
+        cmake_args = list(config['cmake_args'])
         
         # Add Termux-specific optimizations
-        self.cmake_args.extend([
-            '-DCMAKE_BUILD_TYPE=RelWithDebInfo',
+        cmake_args.extend([
+            '-DCMAKE_BUILD_TYPE=' + self.build_type,
             '-DCMAKE_INSTALL_PREFIX=' + self.install_prefix,
-            '-DUSE_CCACHE=OFF',  # CCache might not be available in Termux
             '-DNOALIGN=ON',      # Disable alignment for better compatibility
         ])
         
+        # Use ccache when available so repeated builds only hash and link. It is wired in
+        # through CMake's launcher variables alone; box64's own USE_CCACHE would wrap twice.
+        cmake_args.append('-DUSE_CCACHE=OFF')
+        if self._setup_ccache():
+            cmake_args.extend([
+                '-DCMAKE_C_COMPILER_LAUNCHER=ccache',
+                '-DCMAKE_CXX_COMPILER_LAUNCHER=ccache',
+            ])
+        
         # Add custom arguments
         if custom_args:
-            self.cmake_args.extend(custom_args)
+            cmake_args.extend(custom_args)
         
         # Add all CMake arguments
-        cmake_cmd.extend(self.cmake_args)
+        cmake_cmd.extend(cmake_args)
         
         logger.info(f"CMake command: {' '.join(cmake_cmd)}")
         
-        success, result = self._run_command(' '.join(cmake_cmd))
+        success, result = self._run_command(cmake_cmd, env=self.build_env)
         if not success:
             logger.error(f"CMake configuration failed: {result.stderr if result else 'Unknown error'}")
             return False
@@ -324,20 +404,73 @@ class TermuxBox64Builder:
         logger.info("CMake configuration successful")
         return True
     
-    def build(self, jobs: int = None) -> bool:
+    def _setup_ccache(self) -> bool:
+        """Check for ccache and size its cache. Returns True if ccache can be used."""
+        if not shutil.which('ccache'):
+            logger.info("ccache not found, building without compiler cache")
+            return False
+        
+        # Hand CCACHE_DIR to the configure/build commands rather than this whole process
+        ccache_dir = os.environ.get('CCACHE_DIR') or str(Path.home() / '.ccache')
+        self.build_env = dict(os.environ, CCACHE_DIR=ccache_dir)
+        
+        # Only pick a size once; keep whatever the user (or an earlier run) configured
+        conf = Path(ccache_dir) / 'ccache.conf'
+        try:
+            sized = 'max_size' in conf.read_text()
+        except OSError:
+            sized = False
+        if not sized:
+            success, result = self._run_command(['ccache', '-M', '5G'], env=self.build_env)
+            if not success:
+                logger.warning(f"Failed to set ccache size: {result.stderr if result else 'Unknown error'}")
+        
+        logger.info(f"Using ccache (CCACHE_DIR={ccache_dir})")
+        return True
+    
+    def _get_mem_available_gb(self) -> Optional[float]:
+        """Get available memory in GB from /proc/meminfo."""
+        try:
+            with open('/proc/meminfo', 'r') as f:
+                for line in f:
+                    if line.startswith('MemAvailable:'):
+                        return int(line.split()[1]) / (1024 * 1024)
+        except (OSError, ValueError, IndexError):
+            pass
+        return None
+    
+    def _default_jobs(self, conservative: bool = False) -> int:
+        """Pick a job count from usable CPUs and available memory."""
+        # Termux cgroups may restrict us to a subset of cores (often the little ones)
+        if hasattr(os, 'sched_getaffinity'):
+            cpus = len(os.sched_getaffinity(0))
+        else:
+            cpus = os.cpu_count() or 2
+        if conservative:
+            # Use fewer jobs for mobile devices to avoid overheating
+            return min(2, cpus)
+        
+        jobs = cpus
+        mem_gb = self._get_mem_available_gb()
+        if mem_gb is not None:
+            # Budget ~1.5 GB peak RSS per parallel compile/link job
+            jobs = min(jobs, int(mem_gb // 1.5))
+        return max(1, jobs)
+    
+    def build(self, jobs: int = None, conservative: bool = False) -> bool:
         """Build box64."""
         logger.info("Building box64...")
         
         if jobs is None:
-            # Use fewer jobs for mobile devices to avoid overheating
-            jobs = min(2, os.cpu_count() or 2)
+            parallel_level = os.environ.get('CMAKE_BUILD_PARALLEL_LEVEL')
+            jobs = int(parallel_level) if parallel_level and parallel_level.isdigit() else self._default_jobs(conservative)
         
-        make_cmd = ['make', f'-j{jobs}']
-        self.make_args.extend(make_cmd)
+        # Let CMake dispatch to whichever generator the project was configured with
+        make_cmd = ['cmake', '--build', '.', '--parallel', str(jobs)]
         
-        logger.info(f"Make command: {' '.join(self.make_args)}")
+        logger.info(f"Build command: {' '.join(make_cmd)}")
         
-        success, result = self._run_command(' '.join(self.make_args))
+        success, result = self._run_command(make_cmd, env=self.build_env)
         if not success:
             logger.error(f"Build failed: {result.stderr if result else 'Unknown error'}")
             return False
@@ -349,7 +482,7 @@ class TermuxBox64Builder:
         """Install box64."""
         logger.info("Installing box64...")
         
-        success, result = self._run_command('make install')
+        success, result = self._run_command(['cmake', '--build', '.', '--target', 'install'])
         if not success:
             logger.error(f"Installation failed: {result.stderr if result else 'Unknown error'}")
             return False
@@ -397,7 +530,7 @@ echo "  box64 wine notepad.exe"
         """Run box64 tests."""
         logger.info("Running tests...")
         
-        success, result = self._run_command('ctest -j2')
+        success, result = self._run_command(['ctest', '-j2'])
         if not success:
             logger.warning(f"Tests failed: {result.stderr if result else 'Unknown error'}")
             return False
@@ -410,18 +543,31 @@ echo "  box64 wine notepad.exe"
         logger.info("Cleaning build directory...")
         
         if self.build_dir.exists():
-            shutil.rmtree(self.build_dir)
+            # rm -rf avoids Python's per-file syscall overhead on large build trees
+            success, result = self._run_command(['rm', '-rf', str(self.build_dir)])
+            if not success:
+                shutil.rmtree(self.build_dir)
             logger.info("Build directory cleaned")
     
-    def _run_command(self, cmd: str) -> Tuple[bool, Optional[subprocess.CompletedProcess]]:
-        """Run a shell command and return success status and result."""
+    def _run_command(self, cmd: Union[str, List[str]], env: Optional[Dict[str, str]] = None,
+                     tail_lines: int = 50) -> Tuple[bool, Optional[CommandResult]]:
+        """Run a command, streaming its output to the log, and return success status and result."""
+        argv = shlex.split(cmd) if isinstance(cmd, str) else cmd
         try:
-            result = subprocess.run(
-                cmd, shell=True, capture_output=True, text=True
+            proc = subprocess.Popen(
+                argv, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                text=True, bufsize=1, env=env
             )
+            tail = deque(maxlen=tail_lines)
+            for line in proc.stdout:
+                line = line.rstrip()
+                logger.info(line)
+                tail.append(line)
+            proc.wait()
+            result = CommandResult(proc.returncode, '\n'.join(tail))
             return result.returncode == 0, result
         except Exception as e:
-            logger.error(f"Exception running command '{cmd}': {e}")
+            logger.error(f"Exception running command '{shlex.join(argv)}': {e}")
             return False, None
     
     def show_platforms(self):
@@ -436,7 +582,8 @@ echo "  box64 wine notepad.exe"
     
     def build_box64(self, platform: str = None, custom_args: List[str] = None, 
                    jobs: int = None, install: bool = True, test: bool = False,
-                   clean_build: bool = False, clone_source: bool = True):
+                   clean_build: bool = False, clone_source: bool = True,
+                   conservative: bool = False, force_deps: bool = False):
         """Main build process."""
         logger.info("Starting box64 build process for Termux...")
         
@@ -454,7 +601,7 @@ echo "  box64 wine notepad.exe"
             self.clean()
         
         # Install dependencies
-        if not self.install_termux_dependencies():
+        if not self.install_termux_dependencies(force_deps):
             logger.error("Failed to install dependencies")
             return False
         
@@ -472,7 +619,7 @@ echo "  box64 wine notepad.exe"
             return False
         
         # Build
-        if not self.build(jobs):
+        if not self.build(jobs, conservative):
             return False
         
         # Run tests if requested
@@ -504,6 +651,7 @@ Examples:
   %(prog)s --platform snapdragon-8gen2       # Build for Snapdragon 8 Gen 2
   %(prog)s --cmake-args "-DCMAKE_BUILD_TYPE=Debug"  # Custom CMake arguments
   %(prog)s --jobs 2 --test                   # Build with 2 jobs and run tests
+  %(prog)s --conservative                    # Thermal-friendly 2-job build
   %(prog)s --clean --platform snapdragon-845 # Clean build for Snapdragon 845
   %(prog)s --list-platforms                  # Show available platforms
         """
@@ -514,7 +662,9 @@ Examples:
     parser.add_argument('--cmake-args', nargs='*', default=[],
                        help='Additional CMake arguments')
     parser.add_argument('--jobs', '-j', type=int, default=None,
-                       help='Number of parallel build jobs (default: 2 for mobile)')
+                       help='Number of parallel build jobs (default: based on CPU count and available memory)')
+    parser.add_argument('--conservative', action='store_true',
+                       help='Limit the build to 2 jobs to avoid overheating')
     parser.add_argument('--no-install', action='store_true',
                        help='Build without installing')
     parser.add_argument('--test', '-t', action='store_true',
@@ -534,6 +684,12 @@ Examples:
                        help='Enable verbose output')
     parser.add_argument('--no-clone', action='store_true',
                        help='Skip cloning source (use existing source)')
+    parser.add_argument('--debug-info', action='store_true',
+                       help='Build RelWithDebInfo instead of Release')
+    parser.add_argument('--force-deps', action='store_true',
+                       help='Reinstall dependencies even if they were installed before')
+    parser.add_argument('--ref', '--tag', dest='ref',
+                       help='Branch or tag of box64 to clone (default: upstream HEAD)')
     
     args = parser.parse_args()
 
@@ -544,6 +700,9 @@ Examples:
     # Create builder instance
     builder = TermuxBox64Builder(args.source_dir, args.build_dir)
     builder.install_prefix = args.install_prefix
+    builder.source_ref = args.ref
+    if args.debug_info:
+        builder.build_type = "RelWithDebInfo"
     
     # Show platforms if requested
     if args.list_platforms:
@@ -558,7 +717,9 @@ Examples:
         install=not args.no_install,
         test=args.test,
         clean_build=args.clean,
-        clone_source=not args.no_clone
+        clone_source=not args.no_clone,
+        conservative=args.conservative,
+        force_deps=args.force_deps
     )
     
     return 0 if success else 1
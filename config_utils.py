@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+Config File Utilities Module
+
+Parsing for the key=value config files (such as termux-user.txt) read by the
+scripts in this repository. Standard library only, so scripts that do not need
+paramiko can use it too.
+"""
+
+import re
+
+
+# One line of a key=value config file. Quoted values are unquoted; `bad`
+# matches a non-comment line without '='. Blank and comment lines yield neither.
+_CONFIG_LINE_RE = re.compile(
+    r"""^[ \t]*(?:(?P<key>[^#=\s][^=\n]*?)[ \t]*=[ \t]*"""
+    r"""(?:"(?P<dq>[^"\n]*)"|'(?P<sq>[^'\n]*)'|(?P<raw>[^\n]*?))"""
+    r"""|(?P<bad>[^#\s][^\n]*?))?[ \t]*\r?$""",
+    re.M,
+)
+
+
+def parse_kv_config(data, on_invalid=None):
+    """Parse key=value lines into a dict in one regex pass.
+
+    Non-comment lines without '=' are skipped; on_invalid(line_num, line) is
+    called for each of them when given.
+    """
+    config = {}
+    for m in _CONFIG_LINE_RE.finditer(data):
+        if m['key']:
+            # Quoted values are stored without their quotes
+            config[m['key']] = m['dq'] if m['dq'] is not None else m['sq'] if m['sq'] is not None else m['raw']
+        elif m['bad'] and on_invalid is not None:
+            on_invalid(data.count('\n', 0, m.start()) + 1, m['bad'])
+    return config
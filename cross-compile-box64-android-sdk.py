@@ -34,16 +34,20 @@ import os
 import sys
 import subprocess
 import shutil
+import stat
 import platform
 import argparse
+import functools
 import logging
 import tempfile
 import urllib.request
 import tarfile
 import json
 import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, NamedTuple, Optional, Tuple
 import termux_utils
 
 # Configure logging
@@ -53,6 +57,35 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+class CommandResult(NamedTuple):
+    """Exit status and output tail of a streamed command."""
+    returncode: int
+    stderr: str  # last lines of combined stdout/stderr, for error reporting
+
+def _ndk_host_tag() -> str:
+    """Name of the NDK prebuilt toolchain directory for this host (e.g. linux-x86_64)."""
+    system = platform.system().lower()
+    machine = platform.machine().lower()
+    arch = {'amd64': 'x86_64', 'arm64': 'aarch64'}.get(machine, machine)
+    if system == 'darwin':
+        arch = 'x86_64'  # macOS NDKs ship universal binaries under darwin-x86_64
+    return f'{system}-{arch}'
+
+@functools.lru_cache(maxsize=None)
+def _ndk_has_toolchain(ndk_path: str) -> bool:
+    """Check an NDK directory for the CMake toolchain file and clang drivers (memoized)."""
+    if not os.path.isfile(os.path.join(ndk_path, 'build', 'cmake', 'android.toolchain.cmake')):
+        return False
+    
+    # One directory listing instead of a stat per required binary
+    bin_dir = os.path.join(ndk_path, 'toolchains', 'llvm', 'prebuilt', _ndk_host_tag(), 'bin')
+    try:
+        with os.scandir(bin_dir) as entries:
+            names = {entry.name for entry in entries}
+    except OSError:
+        return False
+    return {'clang', 'clang++'} <= names
+
 class AndroidBox64Builder:
     """Box64 cross-compiler for Android using Android SDK/NDK toolchain."""
     
@@ -74,8 +107,15 @@ class AndroidBox64Builder:
         self.host_arch = platform.machine().lower()
         self.host_system = platform.system().lower()
         
+        # Usable CPUs, honoring cgroup/affinity limits (e.g. in Docker CI runners)
+        try:
+            self._ncpu = len(os.sched_getaffinity(0))
+        except AttributeError:
+            self._ncpu = os.cpu_count() or 4
+        
         # Build configuration
-        self.cmake_args = []
+        self.cmake_defs: Dict[str, str] = {}  # -D definitions keyed by variable name
+        self.cmake_args = []                  # other raw CMake arguments
         self.make_args = []
         self.install_prefix = "/tmp/box64/android"
         
@@ -87,25 +127,25 @@ class AndroidBox64Builder:
         # Android architecture configurations
         self.android_archs = {
             'arm64-v8a': {
-                'cmake_args': ['-DANDROID=ON', '-DARM64=ON', '-DCMAKE_BUILD_TYPE=RelWithDebInfo'],
+                'cmake_defs': {'ANDROID': 'ON', 'ARM64': 'ON', 'CMAKE_BUILD_TYPE': 'RelWithDebInfo'},
                 'description': 'ARM64 (64-bit)',
                 'abi': 'arm64-v8a',
                 'toolchain': 'aarch64-linux-android'
             },
             'armeabi-v7a': {
-                'cmake_args': ['-DANDROID=ON', '-DARM64=OFF', '-DCMAKE_BUILD_TYPE=RelWithDebInfo'],
+                'cmake_defs': {'ANDROID': 'ON', 'ARM64': 'OFF', 'CMAKE_BUILD_TYPE': 'RelWithDebInfo'},
                 'description': 'ARM (32-bit)',
                 'abi': 'armeabi-v7a',
                 'toolchain': 'arm-linux-androideabi'
             },
             'x86_64': {
-                'cmake_args': ['-DANDROID=ON', '-DCMAKE_BUILD_TYPE=RelWithDebInfo'],
+                'cmake_defs': {'ANDROID': 'ON', 'CMAKE_BUILD_TYPE': 'RelWithDebInfo'},
                 'description': 'x86_64 (64-bit)',
                 'abi': 'x86_64',
                 'toolchain': 'x86_64-linux-android'
             },
             'x86': {
-                'cmake_args': ['-DANDROID=ON', '-DCMAKE_BUILD_TYPE=RelWithDebInfo'],
+                'cmake_defs': {'ANDROID': 'ON', 'CMAKE_BUILD_TYPE': 'RelWithDebInfo'},
                 'description': 'x86 (32-bit)',
                 'abi': 'x86',
                 'toolchain': 'i686-linux-android'
@@ -116,23 +156,22 @@ class AndroidBox64Builder:
         """Detect Android SDK installation."""
         logger.info("Detecting Android SDK...")
         
-        # Common Android SDK locations
-        sdk_paths = [
-            os.environ.get('ANDROID_SDK_ROOT'),
-            os.environ.get('ANDROID_HOME'),
-            os.environ.get('ANDROID_SDK'),
-            os.path.expanduser('~/Android/Sdk'),
-            os.path.expanduser('~/android-sdk'),
-            '/opt/android-sdk',
-            '/usr/local/android-sdk',
-            '/home/chenli/Android/Sdk'
-        ]
+        # Common Android SDK locations, an explicit --android-sdk first
+        candidates = [str(self.android_sdk) if self.android_sdk else None]
+        candidates += [os.environ.get(k) for k in ('ANDROID_SDK_ROOT', 'ANDROID_HOME', 'ANDROID_SDK')]
+        candidates += [os.path.expanduser(p) for p in ('~/Android/Sdk', '~/android-sdk',
+                                                       '/opt/android-sdk', '/usr/local/android-sdk')]
         
-        for sdk_path in sdk_paths:
-            if sdk_path and os.path.exists(sdk_path):
-                self.android_sdk = Path(sdk_path).resolve()
-                logger.info(f"Found Android SDK at: {self.android_sdk}")
-                break
+        # Drop duplicates (e.g. ANDROID_HOME == ANDROID_SDK_ROOT) and stat each path at most once
+        self.android_sdk = None
+        for sdk_path in dict.fromkeys(filter(None, candidates)):
+            try:
+                if stat.S_ISDIR(os.stat(sdk_path).st_mode):
+                    self.android_sdk = Path(sdk_path).resolve()
+                    logger.info(f"Found Android SDK at: {self.android_sdk}")
+                    break
+            except OSError:
+                continue
         
         if not self.android_sdk:
             logger.error("Android SDK not found!")
@@ -150,53 +189,61 @@ class AndroidBox64Builder:
         if not self.android_sdk:
             return False
         
-        # Look for NDK in SDK
-        ndk_paths = [
-            self.android_sdk / "ndk",
-            self.android_sdk / "ndk-bundle",
-            self.android_sdk / "ndk" / "latest"
+        # Explicitly configured NDKs come first, in the canonical env-var order
+        env_ndk_paths = [
+            os.environ.get('ANDROID_NDK_HOME'),
+            os.environ.get('ANDROID_NDK_ROOT'),
+            os.environ.get('ANDROID_NDK'),
+            os.environ.get('ANDROID_NDK_PATH')
         ]
         
-        # Also check for standalone NDK
+        # Then NDKs in the SDK, newest side-by-side version first
+        ndk_paths = self._list_sdk_ndks() + [self.android_sdk / "ndk-bundle"]
+        
+        # Finally, common standalone NDK locations
         standalone_ndk_paths = [
-            os.environ.get('ANDROID_NDK_ROOT'),
-            os.environ.get('ANDROID_NDK'),
-            os.path.expanduser('~/Android/Sdk/ndk'),
             os.path.expanduser('~/android-ndk'),
             '/opt/android-ndk',
             '/usr/local/android-ndk'
         ]
         
-        all_ndk_paths = ndk_paths + [Path(p) for p in standalone_ndk_paths if p]
+        all_ndk_paths = ([Path(p) for p in env_ndk_paths if p] + ndk_paths +
+                         [Path(p) for p in standalone_ndk_paths])
+        
+        # An NDK passed with --android-ndk takes precedence over everything
+        if self.android_ndk:
+            all_ndk_paths.insert(0, self.android_ndk)
         
         for ndk_path in all_ndk_paths:
-            if ndk_path.exists():
-                # Check if it's a valid NDK
-                if self._is_valid_ndk(ndk_path):
-                    self.android_ndk = ndk_path.resolve()
-                    self.ndk_version = self._get_ndk_version(ndk_path)
-                    logger.info(f"Found Android NDK at: {self.android_ndk}")
-                    logger.info(f"NDK version: {self.ndk_version}")
-                    return True
+            # Check if it's a valid NDK
+            if self._is_valid_ndk(ndk_path):
+                self.android_ndk = ndk_path.resolve()
+                self.ndk_version = self._get_ndk_version(ndk_path)
+                logger.info(f"Found Android NDK at: {self.android_ndk}")
+                logger.info(f"NDK version: {self.ndk_version}")
+                return True
         
         logger.error("Android NDK not found!")
-        logger.info("Please install Android NDK and set ANDROID_NDK_ROOT environment variable")
+        logger.info("Please install Android NDK and set ANDROID_NDK_HOME or ANDROID_NDK_ROOT environment variable")
         logger.info("Or specify the path with --android-ndk option")
         return False
     
-    def _is_valid_ndk(self, ndk_path: Path) -> bool:
-        """Check if the path contains a valid Android NDK."""
-        required_files = [
-            'build/cmake/android.toolchain.cmake',
-            'toolchains/llvm/prebuilt/linux-x86_64/bin/clang',
-            'toolchains/llvm/prebuilt/linux-x86_64/bin/clang++'
-        ]
+    def _list_sdk_ndks(self) -> List[Path]:
+        """List NDKs installed side by side under <sdk>/ndk, newest version first."""
+        try:
+            with os.scandir(self.android_sdk / "ndk") as entries:
+                ndks = [Path(entry.path) for entry in entries if entry.is_dir()]
+        except OSError:
+            return []
         
-        for file_path in required_files:
-            if not (ndk_path / file_path).exists():
-                return False
+        def version_key(path: Path):
+            return tuple(int(part) for part in path.name.split('.') if part.isdigit())
         
-        return True
+        return sorted(ndks, key=version_key, reverse=True)
+    
+    def _is_valid_ndk(self, ndk_path: Path) -> bool:
+        """Check if the path contains a valid Android NDK."""
+        return _ndk_has_toolchain(str(ndk_path))
     
     def _get_ndk_version(self, ndk_path: Path) -> str:
         """Get NDK version."""
@@ -234,42 +281,52 @@ class AndroidBox64Builder:
         
         arch_config = self.android_archs[arch]
         
-        # Set up toolchain paths
-        toolchain_dir = self.android_ndk / "toolchains" / "llvm" / "prebuilt" / "linux-x86_64"
-        
-        if not toolchain_dir.exists():
-            logger.error(f"Toolchain directory not found: {toolchain_dir}")
+        # The NDK (and its prebuilt toolchain for this host) is validated once during detection
+        if self.ndk_version is None:
+            logger.error("Android NDK toolchain not resolved; run NDK detection first")
             return False
         
         # Set up environment variables
         os.environ['ANDROID_NDK_ROOT'] = str(self.android_ndk)
         os.environ['ANDROID_SDK_ROOT'] = str(self.android_sdk)
         
-        # Configure CMake arguments for Android
-        self.cmake_args.extend([
-            f'-DCMAKE_TOOLCHAIN_FILE={self.android_ndk}/build/cmake/android.toolchain.cmake',
-            f'-DANDROID_ABI={arch_config["abi"]}',
-            f'-DANDROID_PLATFORM=android-28',  # Minimum API level
-            '-DANDROID_STL=c++_shared',
-            '-DANDROID_TOOLCHAIN=clang',
-            '-DANDROID_ARM_NEON=ON' if 'arm' in arch else '',
-            '-DCMAKE_ANDROID_ARCH_ABI=' + arch_config["abi"],
-            '-DCMAKE_ANDROID_NDK=' + str(self.android_ndk),
-            '-DCMAKE_SYSTEM_NAME=Android',
-            '-DCMAKE_SYSTEM_VERSION=28',
-            '-DCMAKE_ANDROID_STL_TYPE=c++_shared'
-        ])
-        
-        # Add architecture-specific arguments
-        self.cmake_args.extend(arch_config['cmake_args'])
+        # Configure CMake definitions for Android
+        self.cmake_defs.update({
+            'CMAKE_TOOLCHAIN_FILE': f'{self.android_ndk}/build/cmake/android.toolchain.cmake',
+            'ANDROID_ABI': arch_config["abi"],
+            'ANDROID_PLATFORM': 'android-28',  # Minimum API level
+            'ANDROID_STL': 'c++_shared',
+            'ANDROID_TOOLCHAIN': 'clang',
+            'CMAKE_ANDROID_ARCH_ABI': arch_config["abi"],
+            'CMAKE_ANDROID_NDK': str(self.android_ndk),
+            'CMAKE_SYSTEM_NAME': 'Android',
+            'CMAKE_SYSTEM_VERSION': '28',
+            'CMAKE_ANDROID_STL_TYPE': 'c++_shared'
+        })
+        if 'arm' in arch:
+            self.cmake_defs['ANDROID_ARM_NEON'] = 'ON'
+        
+        # Add architecture-specific definitions
+        self.cmake_defs.update(arch_config['cmake_defs'])
         
         # Add Android-specific optimizations
-        self.cmake_args.extend([
-            '-DANDROID=ON',
-            '-DBAD_SIGNAL=ON',  # Workaround for Android signal handling
-            '-DNOALIGN=ON',     # Disable alignment for better compatibility
-            '-DUSE_CCACHE=OFF'  # CCache might not work well with cross-compilation
-        ])
+        self.cmake_defs.update({
+            'BAD_SIGNAL': 'ON',  # Workaround for Android signal handling
+            'NOALIGN': 'ON',     # Disable alignment for better compatibility
+        })
+        
+        # Wrap the NDK clang with ccache via the launcher variables, which
+        # leaves the toolchain file untouched. Set CCACHE_DIR to persist the cache.
+        if shutil.which('ccache'):
+            self.cmake_defs.update({
+                'CMAKE_C_COMPILER_LAUNCHER': 'ccache',
+                'CMAKE_CXX_COMPILER_LAUNCHER': 'ccache',
+                # Forward the launchers into try_compile sub-projects so probes are cached too
+                'CMAKE_TRY_COMPILE_PLATFORM_VARIABLES': 'CMAKE_C_COMPILER_LAUNCHER;CMAKE_CXX_COMPILER_LAUNCHER'
+            })
+            os.environ.setdefault('CCACHE_SLOPPINESS', 'time_macros,include_file_mtime,include_file_ctime,pch_defines')
+            os.environ.setdefault('CCACHE_COMPILERCHECK', 'content')
+            logger.info("Using ccache as compiler launcher")
         
         logger.info("Android toolchain configured successfully")
         return True
@@ -282,17 +339,30 @@ class AndroidBox64Builder:
         
         logger.info("Cloning box64 source code...")
         
+        # Reuse an existing (but incomplete) checkout with a shallow fetch instead of recloning
+        if (self.source_dir / ".git").exists():
+            fetch_cmd = ['git', '-C', str(self.source_dir), 'fetch', '--depth=1', 'origin']
+            success, result = self._run_command(fetch_cmd)
+            if success:
+                success, result = self._run_command(['git', '-C', str(self.source_dir), 'reset', '--hard', 'FETCH_HEAD'])
+            if not success:
+                logger.error(f"Failed to update box64 repository: {result.stderr if result else 'Unknown error'}")
+                return False
+            logger.info("Successfully updated box64 repository")
+            return True
+        
         # Create source directory
         self.source_dir.mkdir(parents=True, exist_ok=True)
         
-        # Clone repository
+        # Shallow, partial clone: the build only needs the tip tree
         clone_cmd = [
-            'git', 'clone', 
+            'git', 'clone',
+            '--depth=1', '--filter=blob:none', '--single-branch',
             'https://github.com/ptitSeb/box64.git',
             str(self.source_dir)
         ]
         
-        success, result = self._run_command(' '.join(clone_cmd))
+        success, result = self._run_command(clone_cmd)
         if not success:
             logger.error(f"Failed to clone box64 repository: {result.stderr if result else 'Unknown error'}")
             return False
@@ -304,11 +374,8 @@ class AndroidBox64Builder:
         """Set up the build environment."""
         logger.info("Setting up build environment...")
         
-        # Create build directory
+        # Create build directory (passed to CMake with -B; the working directory is left alone)
         self.build_dir.mkdir(parents=True, exist_ok=True)
-        
-        # Change to build directory
-        os.chdir(self.build_dir)
         logger.info(f"Build directory: {self.build_dir}")
         
         return True
@@ -325,18 +392,32 @@ class AndroidBox64Builder:
         logger.info(f"Architecture description: {arch_config['description']}")
         
         # Base CMake command
-        cmake_cmd = ['cmake', str(self.source_dir)]
+        cmake_cmd = ['cmake', '-S', str(self.source_dir), '-B', str(self.build_dir)]
         
-        # Add custom arguments
-        if custom_args:
-            self.cmake_args.extend(custom_args)
+        # Prefer Ninja over the default Makefiles generator when available
+        if shutil.which('ninja'):
+            cmake_cmd.insert(1, '-GNinja')
+        
+        # Seed the cache with known answers so configure skips the matching probes
+        seed_cache = self.script_dir / "cache" / "android.cmake"
+        if seed_cache.exists():
+            cmake_cmd[1:1] = ['-C', str(seed_cache)]
+        
+        # Add custom arguments; -D definitions override the defaults above
+        for arg in custom_args or []:
+            if arg.startswith('-D') and '=' in arg:
+                name, value = arg[2:].split('=', 1)
+                self._set_cmake_def(name, value)
+            else:
+                self.cmake_args.append(arg)
         
         # Add all CMake arguments
+        cmake_cmd.extend(f'-D{name}={value}' for name, value in self.cmake_defs.items() if value is not None)
         cmake_cmd.extend(self.cmake_args)
         
         logger.info(f"CMake command: {' '.join(cmake_cmd)}")
         
-        success, result = self._run_command(' '.join(cmake_cmd))
+        success, result = self._run_command(cmake_cmd)
         if not success:
             logger.error(f"CMake configuration failed: {result.stderr if result else 'Unknown error'}")
             return False
@@ -344,19 +425,55 @@ class AndroidBox64Builder:
         logger.info("CMake configuration successful")
         return True
     
+    def _get_mem_available(self) -> int:
+        """Get available physical memory in bytes, or 0 if unknown."""
+        # MemAvailable counts reclaimable page cache; free pages alone underestimate
+        try:
+            with open('/proc/meminfo', 'r') as f:
+                for line in f:
+                    if line.startswith('MemAvailable:'):
+                        return int(line.split()[1]) * 1024
+        except (OSError, ValueError, IndexError):
+            pass
+        try:
+            return os.sysconf('SC_AVPHYS_PAGES') * os.sysconf('SC_PAGE_SIZE')
+        except (ValueError, OSError, AttributeError):
+            return 0
+    
+    def _set_cmake_def(self, name: str, value: str):
+        """Set a CMake definition, replacing any earlier one for the same variable (typed or not)."""
+        base = name.split(':', 1)[0]
+        for key in [k for k in self.cmake_defs if k.split(':', 1)[0] == base]:
+            del self.cmake_defs[key]
+        self.cmake_defs[name] = value
+    
     def build(self, jobs: int = None) -> bool:
         """Build box64."""
         logger.info("Building box64...")
         
+        ncpu = self._ncpu
         if jobs is None:
-            jobs = os.cpu_count() or 4
-        
-        make_cmd = ['cmake', '--build', '.', f'-j{jobs}']
+            # Oversubscribe to hide the I/O stalls of NDK clang, but keep each
+            # job within ~1.5 GB of available memory
+            jobs = 2 * ncpu
+            num_cpus = os.environ.get('NUM_CPUS')
+            if num_cpus:
+                if num_cpus.isdigit() and int(num_cpus) > 0:
+                    jobs = int(num_cpus)
+                else:
+                    logger.warning(f"Ignoring invalid NUM_CPUS={num_cpus!r}")
+            mem_available = self._get_mem_available()
+            # 0 means unknown; otherwise even a nearly full host gets one job
+            if mem_available > 0:
+                jobs = max(1, min(jobs, mem_available // int(1.5 * 1024 ** 3)))
+        
+        # Cap the load average so oversubscription doesn't thrash the host
+        make_cmd = ['cmake', '--build', str(self.build_dir), f'-j{jobs}', '--', f'-l{ncpu}']
         self.make_args.extend(make_cmd)
         
         logger.info(f"Make command: {' '.join(self.make_args)}")
         
-        success, result = self._run_command(' '.join(self.make_args))
+        success, result = self._run_command(self.make_args, stream=True)
         if not success:
             logger.error(f"Build failed: {result.stderr if result else 'Unknown error'}")
             return False
@@ -475,9 +592,11 @@ This package contains box64 cross-compiled for Android {arch} architecture.
         archive_path = self.build_dir / archive_name
         
         logger.info(f"Creating archive: {archive_path}")
-        success, result = self._run_command(f"tar -czf {archive_path} -C {self.build_dir} box64/android-{arch}")
-        if not success:
-            logger.error(f"Failed to create archive: {result.stderr if result else 'Unknown error'}")
+        try:
+            with tarfile.open(archive_path, 'w:gz', compresslevel=3) as tf:
+                tf.add(package_dir, arcname=f'box64/android-{arch}')
+        except (OSError, tarfile.TarError) as e:
+            logger.error(f"Failed to create archive: {e}")
             return False
         
         logger.info(f"Android package created: {archive_path}")
@@ -501,16 +620,39 @@ This package contains box64 cross-compiled for Android {arch} architecture.
             shutil.rmtree(self.build_dir)
             logger.info("Build directory cleaned")
     
-    def _run_command(self, cmd: str, custom_env : dict = {}) -> Tuple[bool, Optional[subprocess.CompletedProcess]]:
-        """Run a shell command and return success status and result."""
+    def _run_command(self, argv: List[str], custom_env: Optional[dict] = None,
+                     stream: bool = False, tail_lines: int = 50) -> Tuple[bool, Optional[CommandResult]]:
+        """Run a command and return success status and result.
+        
+        Short commands (configure, clone) are captured and logged once they finish.
+        Pass stream=True for long builds to log output line by line as it arrives,
+        keeping only the last tail_lines lines in memory for error reporting.
+        """
         try:
-            my_env = os.environ | custom_env
-            result = subprocess.run(
-                cmd, shell=True, env = my_env
+            my_env = os.environ | (custom_env or {})
+            if not stream:
+                completed = subprocess.run(
+                    argv, env=my_env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True
+                )
+                for line in completed.stdout.splitlines():
+                    logger.info(line)
+                result = CommandResult(completed.returncode, '\n'.join(completed.stdout.splitlines()[-tail_lines:]))
+                return result.returncode == 0, result
+            
+            proc = subprocess.Popen(
+                argv, env=my_env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                text=True, bufsize=1
             )
+            tail = deque(maxlen=tail_lines)
+            for line in iter(proc.stdout.readline, ''):
+                line = line.rstrip()
+                logger.info(line)
+                tail.append(line)
+            proc.wait()
+            result = CommandResult(proc.returncode, '\n'.join(tail))
             return result.returncode == 0, result
         except Exception as e:
-            logger.error(f"Exception running command '{cmd}': {e}")
+            logger.error(f"Exception running command '{' '.join(argv)}': {e}")
             return False, None
     
     def show_architectures(self):
@@ -539,6 +681,11 @@ This package contains box64 cross-compiled for Android {arch} architecture.
             arch = 'arm64-v8a'
             logger.info(f"Using default architecture: {arch}")
         
+        # Give each architecture its own build directory so switching archs
+        # keeps the CMake/Ninja caches of the others intact
+        if self.build_dir.name != arch:
+            self.build_dir = self.build_dir / arch
+        
         # Clean build if requested
         if clean_build:
             self.clean()
@@ -584,6 +731,30 @@ This package contains box64 cross-compiled for Android {arch} architecture.
         logger.info(f"Install prefix: {self.install_prefix}")
         return True
 
+def build_one(arch: str, args: argparse.Namespace, jobs: int) -> bool:
+    """Build box64 for one architecture in a fresh builder with its own build directory.
+    
+    Used as the multi-arch worker: the builder mutates its cmake args and os.environ,
+    so each architecture gets its own process and instance.
+    """
+    builder = AndroidBox64Builder(args.source_dir, args.build_dir)
+    builder.install_prefix = args.install_prefix
+    if args.android_sdk:
+        builder.android_sdk = Path(args.android_sdk).resolve()
+    if args.android_ndk:
+        builder.android_ndk = Path(args.android_ndk).resolve()
+    
+    return builder.build_box64(
+        arch=arch,
+        custom_args=args.cmake_args,
+        jobs=jobs,
+        install=False,
+        test=args.test,
+        clean_build=args.clean,
+        clone_source=False,  # cloned once by the parent process
+        create_package=False, # obsolete
+    )
+
 def main():
     """Main entry point."""
     parser = argparse.ArgumentParser(
@@ -598,6 +769,7 @@ Examples:
   %(prog)s --cmake-args "-DCMAKE_BUILD_TYPE=Debug"  # Custom CMake arguments
   %(prog)s --jobs 8 --create-package         # Build with 8 jobs and create package
   %(prog)s --clean --arch x86_64             # Clean build for x86_64
+  %(prog)s --archs arm64-v8a,x86_64          # Build several architectures in parallel
   %(prog)s --termux-deploy                   # Deploy to Termux /usr/bin (run from Termux)
   %(prog)s --list-archs                       # Show available architectures
         """
@@ -605,6 +777,8 @@ Examples:
     
     parser.add_argument('--arch', '-a', default='arm64-v8a',
                        help='Target Android architecture (default: arm64-v8a)')
+    parser.add_argument('--archs',
+                       help='Comma-separated list of architectures to build in parallel')
     parser.add_argument('--android-sdk',
                        help='Android SDK path (auto-detect if not specified)')
     parser.add_argument('--android-ndk',
@@ -624,7 +798,7 @@ Examples:
     parser.add_argument('--source-dir',
                        help='Source directory (default: dependencies/box64)')
     parser.add_argument('--build-dir',
-                       help='Build directory (default: build/box64/android)')
+                       help='Build directory; a per-architecture subdirectory is used (default: build/box64/android)')
     parser.add_argument('--install-prefix',
                        default='/tmp/box64/android',
                        help='Installation prefix (default: /tmp/box64/android)')
@@ -654,6 +828,31 @@ Examples:
         builder.show_architectures()
         return 0
     
+    # Build several architectures in parallel, one process per architecture
+    if args.archs is not None:
+        archs = list(dict.fromkeys(arch.strip() for arch in args.archs.split(',') if arch.strip()))
+        if not archs:
+            parser.error("--archs needs at least one architecture")
+        unknown = [arch for arch in archs if arch not in builder.android_archs]
+        if unknown:
+            parser.error(f"unknown architecture(s) for --archs: {', '.join(unknown)} "
+                         f"(choose from {', '.join(builder.android_archs)})")
+        if args.install:
+            logger.error("--install is not supported with --archs; deploy a single --arch instead")
+            return 1
+        
+        if not args.no_clone and not builder.clone_box64_source():
+            return 1
+        
+        # Split the cores between the concurrent builds to avoid oversubscription
+        jobs = args.jobs or max(1, builder._ncpu // len(archs))
+        with ProcessPoolExecutor(max_workers=len(archs)) as executor:
+            results = list(executor.map(build_one, archs, [args] * len(archs), [jobs] * len(archs)))
+        
+        for arch, result in zip(archs, results):
+            logger.info(f"{arch}: {'succeeded' if result else 'FAILED'}")
+        return 0 if all(results) else 1
+    
     # Build box64
     success = builder.build_box64(
         arch=args.arch,
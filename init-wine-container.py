@@ -6,23 +6,63 @@ This script initializes a Wine container, installs Steam dependencies, DXVK file
 Default target folder is ./container-01, but can be customized.
 """
 
+import errno
+import functools
 import os
 import sys
+import shlex
 import shutil
 import subprocess
 import argparse
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from types import MappingProxyType
+
+
+# Number of trailing stderr lines kept for error reporting
+STDERR_TAIL_LINES = 200
+
+
+def _stream_command(cmd, cwd=None, env=None):
+    """Run a command, streaming its stdout as it arrives.
+
+    stderr is drained on a background thread into a bounded buffer, so memory
+    stays flat however much Wine or winetricks prints. Returns the exit code
+    and the last STDERR_TAIL_LINES lines of stderr.
+    """
+    proc = subprocess.Popen(
+        cmd,
+        shell=isinstance(cmd, str),
+        cwd=cwd,
+        env=env,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        bufsize=1,
+    )
+    stderr_tail = deque(maxlen=STDERR_TAIL_LINES)
+    drain = threading.Thread(target=stderr_tail.extend, args=(proc.stderr,), daemon=True)
+    drain.start()
+    for line in proc.stdout:
+        sys.stdout.write(line)
+    proc.wait()
+    drain.join()
+    return proc.returncode, "".join(stderr_tail)
 
 
 def run_command(cmd, cwd=None, env=None):
-    """Run a shell command and return the result."""
+    """Run a command and return whether it succeeded.
+
+    cmd is normally an argv list, which is executed directly; a string is
+    still accepted and run through the shell.
+    """
     try:
-        result = subprocess.run(
-            cmd, shell=True, cwd=cwd, env=env, capture_output=True, text=True
-        )
-        if result.returncode != 0:
-            print(f"Error running command: {cmd}")
-            print(f"Error output: {result.stderr}")
+        returncode, stderr = _stream_command(cmd, cwd=cwd, env=env)
+        if returncode != 0:
+            print(f"Error running command: {cmd if isinstance(cmd, str) else shlex.join(cmd)}")
+            print(f"Error output: {stderr}")
             return False
         return True
     except Exception as e:
@@ -30,35 +70,52 @@ def run_command(cmd, cwd=None, env=None):
         return False
 
 
+@functools.lru_cache(maxsize=8)
+def _wine_env(prefix, first_boot=False):
+    """Return the (read-only) environment for Wine commands in prefix.
+
+    Built once per prefix instead of copying os.environ for every command.
+    first_boot additionally disables the Mono/Gecko install prompts and debug
+    tracing to speed up wineboot.
+    """
+    env = os.environ.copy()
+    env["WINEPREFIX"] = prefix
+    if first_boot:
+        env.setdefault("WINEDLLOVERRIDES", "mscoree,mshtml=")
+        env.setdefault("WINEDEBUG", "-all")
+    return MappingProxyType(env)
+
+
 def run_wine_command(cmd, container_path):
     """Run a Wine command with the specified container path."""
-    env = os.environ.copy()
-    env["WINEPREFIX"] = str(container_path.absolute())
-    return run_command(cmd, env=env)
+    return run_command(cmd, env=_wine_env(str(container_path.absolute())))
 
 
 def initialize_wine_container(container_path):
     """Initialize a Wine container with default Windows files."""
     print(f"Initializing Wine container at: {container_path}")
 
+    # Skip wineboot on a warm prefix; it takes seconds even when there is nothing to do
+    if (container_path / "drive_c" / "windows" / "system32" / "ntdll.dll").exists() and (
+        container_path / "system.reg"
+    ).exists():
+        print("Prefix already initialized, skipping wineboot")
+        return True
+
     # Create container directory if it doesn't exist
     container_path.mkdir(parents=True, exist_ok=True)
 
     # Set WINEPREFIX environment variable
-    env = os.environ.copy()
-    env["WINEPREFIX"] = str(container_path.absolute())
+    env = _wine_env(str(container_path.absolute()), first_boot=True)
 
     # Initialize Wine (this creates the default Windows file structure)
     print("Creating Wine prefix...")
-    cmd = "wineboot --init"
+    cmd = ["wineboot", "--init"]
     try:
-        result = subprocess.run(
-            cmd, shell=True, env=env, capture_output=True, text=True
-        )
-        if result.returncode != 0:
-            print(f"Warning: wineboot returned non-zero exit code: {result.returncode}")
-            print(f"Output: {result.stdout}")
-            print(f"Error: {result.stderr}")
+        returncode, stderr = _stream_command(cmd, env=env)
+        if returncode != 0:
+            print(f"Warning: wineboot returned non-zero exit code: {returncode}")
+            print(f"Error: {stderr}")
     except Exception as e:
         print(f"Error running wineboot: {e}")
         return False
@@ -82,7 +139,7 @@ def install_steam_dependencies(container_path):
 
     # Use winetricks to install Steam and all its dependencies
     print("Installing Steam and dependencies with winetricks...")
-    cmd = "winetricks -q steam"
+    cmd = ["winetricks", "-q", "steam"]
     if not run_wine_command(cmd, container_path):
         print("Warning: Steam installation failed, but continuing...")
         return False
@@ -91,6 +148,111 @@ def install_steam_dependencies(container_path):
     return True
 
 
+# Userspace copy buffer size for the fallback path; large enough for multi-MB DLLs
+COPY_BUFFER_SIZE = 1 << 20
+
+
+# Per-thread state for the copy workers (each keeps its own copy buffer)
+_thread_state = threading.local()
+
+
+def _fast_copy(src, dst, buf=None, size=None):
+    """Copy file contents from src to dst, keeping the data inside the kernel when possible.
+
+    Tries copy_file_range (which can reflink on btrfs/xfs), then sendfile, then
+    falls back to a userspace read/write loop through buf. A method that stops
+    short of size is abandoned and the copy restarts with the next one. Callers copying a batch
+    of files should allocate the buffer once and pass it in, along with the
+    source size if they already have it from a directory scan.
+    """
+    in_fd = os.open(src, os.O_RDONLY | os.O_CLOEXEC)
+    try:
+        out_fd = os.open(dst, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | os.O_CLOEXEC, 0o644)
+        try:
+            if size is None:
+                size = os.fstat(in_fd).st_size
+            for copy in (_copy_file_range, _sendfile):
+                try:
+                    copy(in_fd, out_fd, size)
+                    return
+                except (AttributeError, OSError) as e:
+                    if isinstance(e, OSError) and e.errno not in (
+                        errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP
+                    ):
+                        raise
+                    # Restart from scratch with the next method
+                    os.lseek(in_fd, 0, os.SEEK_SET)
+                    os.ftruncate(out_fd, 0)
+                    os.lseek(out_fd, 0, os.SEEK_SET)
+            _read_write_copy(in_fd, out_fd, buf if buf is not None else bytearray(COPY_BUFFER_SIZE))
+        finally:
+            os.close(out_fd)
+    finally:
+        os.close(in_fd)
+
+
+def _copy_file_range(in_fd, out_fd, size):
+    """Copy size bytes with copy_file_range (in-kernel, reflink-capable)."""
+    remaining = size
+    while remaining > 0:
+        copied = os.copy_file_range(in_fd, out_fd, remaining)
+        if copied == 0:
+            # Some FUSE/overlay mounts report 0 instead of an error; let the caller fall back
+            raise OSError(errno.EOPNOTSUPP, f"copy_file_range stopped with {remaining} bytes left")
+        remaining -= copied
+
+
+def _sendfile(in_fd, out_fd, size):
+    """Copy size bytes with sendfile (in-kernel)."""
+    offset = 0
+    while offset < size:
+        sent = os.sendfile(out_fd, in_fd, offset, size - offset)
+        if sent == 0:
+            raise OSError(errno.EOPNOTSUPP, f"sendfile stopped with {size - offset} bytes left")
+        offset += sent
+
+
+def _read_write_copy(in_fd, out_fd, buf):
+    """Copy through userspace, reading into the preallocated buf."""
+    view = memoryview(buf)
+    while True:
+        n = os.readv(in_fd, [buf])
+        if n == 0:
+            break
+        written = 0
+        while written < n:
+            written += os.write(out_fd, view[written:n])
+
+
+def _copy_buffer():
+    """Return this thread's reusable copy buffer, allocating it on first use."""
+    buf = getattr(_thread_state, "buf", None)
+    if buf is None:
+        buf = _thread_state.buf = bytearray(COPY_BUFFER_SIZE)
+    return buf
+
+
+def _scan_dlls(src_dir):
+    """Return DirEntry objects for the regular .dll files in src_dir."""
+    with os.scandir(src_dir) as it:
+        return [e for e in it if e.name.endswith(".dll") and e.is_file(follow_symlinks=False)]
+
+
+def _copy_one(pair):
+    """Copy one (DirEntry, dst) pair with metadata, like shutil.copy2."""
+    src, dst = pair
+    _fast_copy(src.path, dst, _copy_buffer(), src.stat(follow_symlinks=False).st_size)
+    shutil.copystat(src.path, dst)
+
+
+def _copy_files(pairs):
+    """Copy (DirEntry, dst) pairs concurrently; the copies release the GIL."""
+    if not pairs:
+        return
+    with ThreadPoolExecutor(max_workers=min(8, len(pairs))) as executor:
+        list(executor.map(_copy_one, pairs))
+
+
 def copy_dxvk_files(container_path, dxvk_path):
     """Copy DXVK files to the Wine container's system directories."""
     print("Installing DXVK files...")
@@ -103,25 +265,24 @@ def copy_dxvk_files(container_path, dxvk_path):
     system32_path.mkdir(parents=True, exist_ok=True)
     syswow64_path.mkdir(parents=True, exist_ok=True)
 
-    # Copy x64 files to system32 (64-bit applications)
-    x64_src = dxvk_path / "x64"
-    if x64_src.exists():
-        print("Copying x64 DXVK files to system32 (64-bit)...")
-        for file in x64_src.glob("*.dll"):
-            shutil.copy2(file, system32_path)
-            print(f"  Copied: {file.name}")
-    else:
-        print("Warning: x64 DXVK directory not found")
-
-    # Copy x32 files to syswow64 (32-bit applications)
-    x32_src = dxvk_path / "x32"
-    if x32_src.exists():
-        print("Copying x32 DXVK files to syswow64 (32-bit)...")
-        for file in x32_src.glob("*.dll"):
-            shutil.copy2(file, syswow64_path)
-            print(f"  Copied: {file.name}")
-    else:
-        print("Warning: x32 DXVK directory not found")
+    # Copy x64 files to system32 (64-bit applications) and x32 files to
+    # syswow64 (32-bit applications) in a single scandir pass per directory
+    pairs = []
+    summary = []
+    for arch, src_dir, dst_dir in [
+        ("x64", dxvk_path / "x64", system32_path),
+        ("x32", dxvk_path / "x32", syswow64_path),
+    ]:
+        if not src_dir.exists():
+            print(f"Warning: {arch} DXVK directory not found")
+            continue
+        dlls = _scan_dlls(src_dir)
+        pairs.extend((entry, dst_dir / entry.name) for entry in dlls)
+        names = ", ".join(entry.name for entry in dlls)
+        summary.append(f"Copied {len(dlls)} {arch} DXVK files to {dst_dir.name}: {names}")
+
+    _copy_files(pairs)
+    sys.stdout.write("".join(f"{line}\n" for line in summary))
 
     print("DXVK files installed successfully!")
 
@@ -138,72 +299,54 @@ def copy_vkd3d_proton_files(container_path, vkd3d_path):
     system32_path.mkdir(parents=True, exist_ok=True)
     syswow64_path.mkdir(parents=True, exist_ok=True)
 
-    # Copy x64 files to system32 (64-bit applications)
-    x64_src = vkd3d_path / "x64"
-    if x64_src.exists():
-        print("Copying x64 vkd3d-proton files to system32 (64-bit)...")
-        for file in x64_src.glob("*.dll"):
-            shutil.copy2(file, system32_path)
-            print(f"  Copied: {file.name}")
-    else:
-        print("Warning: x64 vkd3d-proton directory not found")
-
-    # Copy x32 files to syswow64 (32-bit applications)
-    x32_src = vkd3d_path / "x86"
-    if x32_src.exists():
-        print("Copying x32 vkd3d-proton files to syswow64 (32-bit)...")
-        for file in x32_src.glob("*.dll"):
-            shutil.copy2(file, syswow64_path)
-            print(f"  Copied: {file.name}")
-    else:
-        print("Warning: x32 vkd3d-proton directory not found")
+    # Collect x64 files for system32 (64-bit applications) and x32 files for
+    # syswow64 (32-bit applications), then copy them all in one batch
+    pairs = []
+    for arch, src_dir, dst_dir in [
+        ("x64", vkd3d_path / "x64", system32_path),
+        ("x32", vkd3d_path / "x86", syswow64_path),
+    ]:
+        if not src_dir.exists():
+            print(f"Warning: {arch} vkd3d-proton directory not found")
+            continue
+        pairs.extend((entry, dst_dir / entry.name) for entry in _scan_dlls(src_dir))
+
+    _copy_files(pairs)
+    sys.stdout.write("".join(f"  Copied: {src.name} -> {dst.parent.name}\n" for src, dst in pairs))
 
     print("vkd3d-proton files installed successfully!")
 
 
-def setup_dxvk_registry(container_path, script_dir):
-    """Configure Wine registry to use DXVK DLLs by importing the .reg file."""
-    print("Configuring Wine registry for DXVK...")
+def setup_registries(container_path, reg_files):
+    """Configure Wine registry DLL overrides by importing the given .reg files.
 
-    # Path to the registry file
-    reg_file = script_dir / "dxvk-overrides.reg"
+    All files are imported by a single `wine regedit` call, so the wineserver
+    is only started once.
+    """
+    print("Configuring Wine registry...")
 
-    if not reg_file.exists():
-        print(f"Error: DXVK registry file not found: {reg_file}")
-        return False
+    existing = []
+    for reg_file in reg_files:
+        if not reg_file.exists():
+            print(f"Error: registry file not found: {reg_file}")
+            continue
+        print(f"Importing registry settings: {reg_file}")
+        existing.append(reg_file)
 
-    print(f"Importing DXVK registry settings: {reg_file}")
-
-    # Import the registry file using wine regedit
-    cmd = f"wine regedit {reg_file}"
-    if not run_wine_command(cmd, container_path):
-        print("Warning: DXVK registry configuration failed, but continuing...")
+    if not existing:
         return False
 
-    print("DXVK registry configuration completed successfully!")
-    return True
-
-
-def setup_vkd3d_proton_registry(container_path, script_dir):
-    """Configure Wine registry to use vkd3d-proton DLLs by importing the .reg file."""
-    print("Configuring Wine registry for vkd3d-proton...")
-
-    # Path to the registry file
-    reg_file = script_dir / "vkd3d-proton-overrides.reg"
-
-    if not reg_file.exists():
-        print(f"Error: vkd3d-proton registry file not found: {reg_file}")
+    # Import the registry files using wine regedit
+    cmd = ["wine", "regedit", *(str(reg_file) for reg_file in existing)]
+    if not run_wine_command(cmd, container_path):
+        print("Warning: registry configuration failed, but continuing...")
         return False
 
-    print(f"Importing vkd3d-proton registry settings: {reg_file}")
-
-    # Import the registry file using wine regedit
-    cmd = f"wine regedit {reg_file}"
-    if not run_wine_command(cmd, container_path):
-        print("Warning: vkd3d-proton registry configuration failed, but continuing...")
+    if len(existing) != len(reg_files):
+        print(f"Warning: imported {len(existing)} of {len(reg_files)} registry files")
         return False
 
-    print("vkd3d-proton registry configuration completed successfully!")
+    print("Registry configuration completed successfully!")
     return True
 
 
@@ -292,24 +435,24 @@ def main():
     else:
         print("Skipping Steam dependencies installation")
 
-    # Copy DXVK files after Steam. Configure Wine registry for DXVK if not skipped
+    # Copy DXVK files after Steam, then vkd3d-proton files. Their registry
+    # overrides are imported together afterwards.
+    reg_files = []
     if not args.skip_dxvk:
         copy_dxvk_files(container_path, dxvk_path)
-        if not setup_dxvk_registry(container_path, script_dir):
-            print("Warning: DXVK registry configuration failed, but continuing...")
+        reg_files.append(script_dir / "dxvk-overrides.reg")
     else:
         print("Skipping DXVK registry configuration")
 
-    # Copy vkd3d-proton files after DXVK
     if not args.skip_vkd3d:
         copy_vkd3d_proton_files(container_path, vkd3d_path)
-        if not setup_vkd3d_proton_registry(container_path, script_dir):
-            print(
-                "Warning: vkd3d-proton registry configuration failed, but continuing..."
-            )
+        reg_files.append(script_dir / "vkd3d-proton-overrides.reg")
     else:
         print("Skipping vkd3d-proton installation")
 
+    if reg_files and not setup_registries(container_path, reg_files):
+        print("Warning: Wine registry configuration failed, but continuing...")
+
     print("\nWine container setup complete!")
     print(f"Container location: {container_path}")
     print(f"To use this container, set WINEPREFIX={container_path}")
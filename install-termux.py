@@ -14,15 +14,12 @@ For SSH-based compilation, the script requires:
 import os
 import sys
 import shutil
-import subprocess
-import argparse
-import platform
+import hashlib
 import urllib.request
-import zipfile
-import tarfile
-import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import termux_utils
+from adb_utils import parse_adb_devices
 # # Import termux utilities
 # try:
 #     from termux_utils import (
@@ -53,14 +50,12 @@ def check_adb_connection():
         return False
     
     # Check if device is connected
-    success, result = termux_utils.run_command("adb devices", check=False)
+    success, result = termux_utils.run_command(["adb", "devices"], check=False)
     if not success:
         print("Error: Failed to run adb devices")
         return False
     
-    # Parse device list
-    lines = result.stdout.strip().split('\n')[1:]  # Skip header
-    devices = [line for line in lines if line.strip() and 'device' in line]
+    devices = parse_adb_devices(result.stdout)
     
     if not devices:
         print("Error: No Android device connected")
@@ -72,14 +67,34 @@ def check_adb_connection():
     for device in devices:
         print(f"  {device}")
     
+    # Pin one device for all later adb calls (adb reads ANDROID_SERIAL), so
+    # they keep working and target the same phone when several are connected
+    serial = os.environ.get("ANDROID_SERIAL")
+    if serial and serial not in devices:
+        print(f"Error: ANDROID_SERIAL device {serial} is not connected")
+        return False
+    if not serial:
+        serial = os.environ["ANDROID_SERIAL"] = devices[0]
+    print(f"Using device {serial}")
+    
     return True
 
 
+# Read size for downloads; APKs are tens of MB
+DOWNLOAD_BUFFER_SIZE = 1 << 20
+
+
 def download_file(url, destination):
     """Download a file from URL to destination."""
     print(f"Downloading {url} to {destination}")
     try:
-        urllib.request.urlretrieve(url, destination)
+        with urllib.request.urlopen(url) as resp:
+            # Fail before creating the output file
+            if resp.status != 200:
+                print(f"Error downloading {url}: HTTP {resp.status}")
+                return False
+            with open(destination, 'wb') as f:
+                shutil.copyfileobj(resp, f, length=DOWNLOAD_BUFFER_SIZE)
         return True
     except Exception as e:
         print(f"Error downloading {url}: {e}")
@@ -90,68 +105,143 @@ def download_file(url, destination):
 
 def run_adb_command(cmd):
     """Run a command on Android device via ADB shell."""
-    full_cmd = f"adb shell '{cmd}'"
-    return termux_utils.run_command(full_cmd, check=False)
+    return termux_utils.run_command(["adb", "shell", cmd], check=False)
+
+
+
+
+# APKs to install: (display name, package name, local APK path)
+TERMUX_APKS = [
+    ("Termux", "com.termux", "dependencies/com.termux_1022.apk"),
+    ("Termux X11", "com.termux.x11", "dependencies/termux-x11-app-arm64-v8a-debug-nightly-release-20250609.apk"),
+]
+
+# Stamp files recording APKs already installed on a device
+STAMP_DIR = Path(__file__).parent / ".cache"
+
+
+def _sha256_file(path):
+    """Return the hex sha256 digest of a file."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        while chunk := f.read(DOWNLOAD_BUFFER_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _install_stamp(digest, serial):
+    """Stamp file marking the APK with this sha256 as installed on the device with this serial."""
+    return STAMP_DIR / f"termux-installed-{serial}-{digest}.stamp"
+
+
+def probe_device():
+    """Query the device ABI, SDK level and installed packages in one adb round-trip.
 
+    Returns a dict with "abi" (str), "sdk" (int, 0 if unknown) and "packages"
+    (set of package names), or None if the device could not be queried.
+    """
+    success, result = run_adb_command(
+        'echo "abi=$(getprop ro.product.cpu.abi)"; '
+        'echo "sdk=$(getprop ro.build.version.sdk)"; '
+        'pm list packages'
+    )
+    if not success or result.returncode != 0:
+        return None
 
+    info = {"abi": "", "sdk": 0, "packages": set()}
+    for line in result.stdout.splitlines():
+        key, _, value = line.strip().partition("=")
+        if key == "abi":
+            info["abi"] = value
+        elif key == "sdk":
+            info["sdk"] = int(value) if value.isdigit() else 0
+        elif line.startswith("package:"):
+            info["packages"].add(line[len("package:"):].strip())
+    return info
 
 
 def install_termux_on_android():
-    """Install Termux on Android device if not present."""
+    """Install Termux on Android device if not present.
+
+    An APK installed by an earlier run is recorded with a stamp file, so re-runs
+    skip the device round-trip entirely. Delete .cache/ after uninstalling an app
+    from the device to have it reinstalled.
+    """
     print("Checking for Termux installation...")
-    
-    # Check if Termux is installed
-    success, result = run_adb_command("pm list packages | grep com.termux")
-    termux_installed = success and "com.termux" in result.stdout
-    if termux_installed:
-        print("Termux is already installed")
-    else:
-        # Try tnstall termux apk via adb
-        # Paths to local APK files in dependencies folder
-        termux_apk_path = "dependencies/com.termux_1022.apk"
-
-        # Check if Termux APK exists
-        if not os.path.exists(termux_apk_path):
-            print(f"Error: Termux APK not found at {termux_apk_path}")
-            return False
 
-        # Install Termux APK via adb
-        print("Installing Termux APK via adb...")
-        success, result = termux_utils.run_command(f"adb install -r {termux_apk_path}", check=False)
-        if not success or (result and "Success" not in result.stdout):
-            print(f"Failed to install Termux APK: {result.stderr if result else 'Unknown error'}")
-            return False
-        
-        print("Termux installed successfully!")
-
-    # Check if Termux X11 is installed
-    success_x11, result_x11 = run_adb_command("pm list packages | grep com.termux.x11")
-    termux_x11_installed = success_x11 and "com.termux.x11" in result_x11.stdout
-    if termux_x11_installed:
-        print("Termux X11 is already installed")
-    else:
-        # Try to install termux x11 apk via adb
-        # Paths to local APK files in dependencies folder
-        termux_x11_apk_path = "dependencies/termux-x11-app-arm64-v8a-debug-nightly-release-20250609.apk"
-
-        # Check if Termux X11 APK exists
-        if not os.path.exists(termux_x11_apk_path):
-            print(f"Error: Termux X11 APK not found at {termux_x11_apk_path}")
+    # Check the APKs exist
+    for name, _, apk_path in TERMUX_APKS:
+        if not os.path.exists(apk_path):
+            print(f"Error: {name} APK not found at {apk_path}")
             return False
 
-        # Install Termux X11 APK via adb
-        print("Installing Termux X11 APK via adb...")
-        success, result = termux_utils.run_command(f"adb install -r {termux_x11_apk_path}", check=False)
+    # Stamps are per device, so they need the serial pinned by check_adb_connection()
+    serial = os.environ.get("ANDROID_SERIAL")
+    if not serial:
+        print("Error: no device selected; run check_adb_connection() first")
+        return False
+
+    # Hash the APKs in parallel; hashlib releases the GIL on large reads
+    with ThreadPoolExecutor(max_workers=len(TERMUX_APKS)) as executor:
+        digests = list(executor.map(_sha256_file, [apk_path for _, _, apk_path in TERMUX_APKS]))
+
+    # Drop the APKs already stamped for this device
+    pending = []
+    for (name, package, apk_path), digest in zip(TERMUX_APKS, digests):
+        stamp = _install_stamp(digest, serial)
+        if stamp.exists():
+            print(f"{name} is already installed")
+        else:
+            pending.append((name, package, apk_path, stamp))
+
+    if not pending:
+        return True
+
+    # Query the device once and match the package list locally
+    device = probe_device() or {"abi": "", "sdk": 0, "packages": set()}
+    if device["abi"] and device["abi"] != "arm64-v8a":
+        print(f"Warning: device ABI is {device['abi']}, but the Termux X11 APK is built for arm64-v8a")
+
+    to_install = []
+    for name, package, apk_path, stamp in pending:
+        if package in device["packages"]:
+            print(f"{name} is already installed")
+        else:
+            to_install.append((name, apk_path))
+
+    # Install all missing APKs in one adb session; install-multi-package needs
+    # Android 10 (SDK 29)+, so fall back to one install per APK if it is rejected
+    if len(to_install) > 1 and (device["sdk"] == 0 or device["sdk"] >= 29):
+        print(f"Installing {', '.join(name for name, _ in to_install)} APKs via adb...")
+        apk_args = [apk_path for _, apk_path in to_install]
+        success, result = termux_utils.run_command(["adb", "install-multi-package", "-r", *apk_args], check=False)
+        if success and result and result.returncode == 0 and "Success" in result.stdout:
+            for name, _ in to_install:
+                print(f"{name} installed successfully!")
+            to_install = []
+        else:
+            print("Batched install failed, installing APKs one at a time...")
+
+    for name, apk_path in to_install:
+        # Install the APK via adb
+        print(f"Installing {name} APK via adb...")
+        success, result = termux_utils.run_command(["adb", "install", "-r", apk_path], check=False)
         if not success or (result and "Success" not in result.stdout):
-            print(f"Failed to install Termux X11 APK: {result.stderr if result else 'Unknown error'}")
+            print(f"Failed to install {name} APK: {result.stderr if result else 'Unknown error'}")
             return False
-        
-        print("Termux X11 installed successfully!")
+
+        print(f"{name} installed successfully!")
+
+    STAMP_DIR.mkdir(parents=True, exist_ok=True)
+    for _, _, _, stamp in pending:
+        stamp.touch()
 
     # Done
     return True
 
 def main():
+    if not check_adb_connection():
+        sys.exit(1)
     if not install_termux_on_android():
         sys.exit(1)
 
@@ -30,10 +30,13 @@ import sys
 import subprocess
 import shutil
 import argparse
+import json
 import logging
 from pathlib import Path
 from typing import Optional, List, Tuple
 
+from adb_utils import parse_adb_devices
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -41,6 +44,28 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Detected SDK, adb and scrcpy paths are remembered here between runs
+PATH_CACHE_FILE = Path(os.environ.get('XDG_CACHE_HOME') or '~/.cache').expanduser() / 'wine-droid' / 'sdk_paths.json'
+
+
+def _candidate_sdks():
+    """Yield common Android SDK locations, most specific first."""
+    for var in ('ANDROID_SDK_ROOT', 'ANDROID_HOME', 'ANDROID_SDK'):
+        yield os.environ.get(var)
+    yield os.path.expanduser('~/Android/Sdk')
+    yield os.path.expanduser('~/android-sdk')
+    yield '/opt/android-sdk'
+    yield '/usr/local/android-sdk'
+
+
+def _candidate_scrcpys():
+    """Yield scrcpy locations: the dependencies directory first, then the system PATH."""
+    scrcpy_dir = Path(__file__).parent / 'dependencies' / 'scrcpy'
+    yield scrcpy_dir / 'scrcpy'
+    yield scrcpy_dir / 'scrcpy.exe'
+    system_scrcpy = shutil.which('scrcpy')
+    yield Path(system_scrcpy) if system_scrcpy else None
+
 
 class ScrcpyRunner:
     """Scrcpy runner using Android SDK ADB."""
@@ -55,10 +80,55 @@ class ScrcpyRunner:
         if android_sdk_path:
             self.android_sdk = Path(android_sdk_path).resolve()
         
-        # Detect paths
-        self._detect_android_sdk()
-        self._detect_adb()
-        self._detect_scrcpy()
+        # Detect paths, reusing the previous run's results when still valid
+        if not self._load_cached_paths():
+            # Run every detection so each missing tool gets reported, not just the first
+            found = [self._detect_android_sdk(), self._detect_adb(), self._detect_scrcpy()]
+            if all(found):
+                self._save_cached_paths()
+    
+    def _cache_key(self) -> dict:
+        """Inputs that detection depends on; a cache written with other inputs is ignored."""
+        return {
+            'android_sdk': str(self.android_sdk) if self.android_sdk else None,
+            'env': [os.environ.get(k) for k in ('ANDROID_SDK_ROOT', 'ANDROID_HOME', 'ANDROID_SDK')],
+        }
+    
+    def _load_cached_paths(self) -> bool:
+        """Load detected paths from PATH_CACHE_FILE if they still exist."""
+        try:
+            with open(PATH_CACHE_FILE) as f:
+                cached = json.load(f)
+            if cached['key'] != self._cache_key():
+                return False
+            paths = [Path(cached[name]) for name in ('android_sdk', 'adb', 'scrcpy')]
+        except (OSError, ValueError, KeyError, TypeError):
+            return False
+        
+        if not all(path.exists() for path in paths):
+            return False
+        
+        self.android_sdk, self.adb_path, self.scrcpy_path = paths
+        logger.info(f"Using cached Android SDK: {self.android_sdk}")
+        logger.info(f"Using cached ADB: {self.adb_path}")
+        logger.info(f"Using cached scrcpy: {self.scrcpy_path}")
+        return True
+    
+    def _save_cached_paths(self):
+        """Remember the detected paths for the next run."""
+        cached = {
+            'key': self._cache_key(),
+            'android_sdk': str(self.android_sdk),
+            'adb': str(self.adb_path),
+            'scrcpy': str(self.scrcpy_path),
+        }
+        try:
+            PATH_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = PATH_CACHE_FILE.with_suffix('.tmp')
+            tmp_file.write_text(json.dumps(cached))
+            os.replace(tmp_file, PATH_CACHE_FILE)
+        except OSError as e:
+            logger.debug(f"Could not write path cache {PATH_CACHE_FILE}: {e}")
     
     def _detect_android_sdk(self) -> bool:
         """Detect Android SDK installation."""
@@ -68,23 +138,11 @@ class ScrcpyRunner:
         
         logger.info("Detecting Android SDK...")
         
-        # Common Android SDK locations
-        sdk_paths = [
-            os.environ.get('ANDROID_SDK_ROOT'),
-            os.environ.get('ANDROID_HOME'),
-            os.environ.get('ANDROID_SDK'),
-            os.path.expanduser('~/Android/Sdk'),
-            os.path.expanduser('~/android-sdk'),
-            '/opt/android-sdk',
-            '/usr/local/android-sdk',
-            '/home/chenli/Android/Sdk'
-        ]
-        
-        for sdk_path in sdk_paths:
-            if sdk_path and os.path.exists(sdk_path):
-                self.android_sdk = Path(sdk_path).resolve()
-                logger.info(f"Found Android SDK at: {self.android_sdk}")
-                return True
+        sdk_path = next((p for p in _candidate_sdks() if p and os.path.exists(p)), None)
+        if sdk_path:
+            self.android_sdk = Path(sdk_path).resolve()
+            logger.info(f"Found Android SDK at: {self.android_sdk}")
+            return True
         
         logger.error("Android SDK not found!")
         logger.info("Please install Android SDK and set ANDROID_SDK_ROOT environment variable")
@@ -97,18 +155,16 @@ class ScrcpyRunner:
             return False
         
         # Common ADB locations in Android SDK
-        adb_paths = [
-            self.android_sdk / 'platform-tools' / 'adb',
-            self.android_sdk / 'platform-tools' / 'adb.exe',
-            self.android_sdk / 'tools' / 'adb',
-            self.android_sdk / 'tools' / 'adb.exe',
-        ]
+        adb_paths = (
+            self.android_sdk / subdir / name
+            for subdir in ('platform-tools', 'tools')
+            for name in ('adb', 'adb.exe')
+        )
         
-        for adb_path in adb_paths:
-            if adb_path.exists():
-                self.adb_path = adb_path
-                logger.info(f"Found ADB at: {self.adb_path}")
-                return True
+        self.adb_path = next((p for p in adb_paths if p.exists()), None)
+        if self.adb_path:
+            logger.info(f"Found ADB at: {self.adb_path}")
+            return True
         
         logger.error(f"ADB not found in Android SDK: {self.android_sdk}")
         logger.info("Please ensure platform-tools are installed in your Android SDK")
@@ -116,22 +172,11 @@ class ScrcpyRunner:
     
     def _detect_scrcpy(self) -> bool:
         """Detect scrcpy executable."""
-        # Check for scrcpy in dependencies directory
-        scrcpy_paths = [
-            Path(__file__).parent / 'dependencies' / 'scrcpy' / 'scrcpy',
-            Path(__file__).parent / 'dependencies' / 'scrcpy' / 'scrcpy.exe',
-        ]
-        
-        # Also check system PATH
-        system_scrcpy = shutil.which('scrcpy')
-        if system_scrcpy:
-            scrcpy_paths.append(Path(system_scrcpy))
+        self.scrcpy_path = next((p for p in _candidate_scrcpys() if p and p.exists()), None)
         
-        for scrcpy_path in scrcpy_paths:
-            if scrcpy_path and scrcpy_path.exists():
-                self.scrcpy_path = scrcpy_path
-                logger.info(f"Found scrcpy at: {self.scrcpy_path}")
-                return True
+        if self.scrcpy_path:
+            logger.info(f"Found scrcpy at: {self.scrcpy_path}")
+            return True
         
         logger.error("scrcpy executable not found!")
         logger.info("Please ensure scrcpy is installed or available in dependencies/scrcpy/")
@@ -158,9 +203,7 @@ class ScrcpyRunner:
                 logger.error(f"ADB command failed: {result.stderr}")
                 return False
             
-            # Parse device list
-            lines = result.stdout.strip().split('\n')[1:]  # Skip header
-            devices = [line for line in lines if line.strip() and 'device' in line]
+            devices = parse_adb_devices(result.stdout)
             
             if not devices:
                 logger.error("No Android device connected")
@@ -197,14 +240,7 @@ class ScrcpyRunner:
             if result.returncode != 0:
                 return []
             
-            lines = result.stdout.strip().split('\n')[1:]  # Skip header
-            devices = []
-            for line in lines:
-                if line.strip() and 'device' in line:
-                    device_id = line.split('\t')[0]
-                    devices.append(device_id)
-            
-            return devices
+            return parse_adb_devices(result.stdout)
             
         except Exception as e:
             logger.error(f"Error listing devices: {e}")
@@ -239,30 +275,26 @@ class ScrcpyRunner:
         logger.info(f"Command: {' '.join(cmd)}")
         
         try:
-            # Run scrcpy
+            # Run scrcpy, with stderr merged into stdout so neither pipe can fill up
             process = subprocess.Popen(
                 cmd,
                 env=env,
                 stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True
+                stderr=subprocess.STDOUT,
+                text=True,
+                bufsize=1
             )
             
             # Stream output
-            while True:
-                output = process.stdout.readline()
-                if output == '' and process.poll() is not None:
-                    break
-                if output:
-                    print(output.strip())
+            for line in process.stdout:
+                sys.stdout.write(line)
+                sys.stdout.flush()
             
             # Wait for process to complete
             return_code = process.wait()
             
             if return_code != 0:
-                stderr_output = process.stderr.read()
-                if stderr_output:
-                    logger.error(f"scrcpy error: {stderr_output}")
+                logger.error(f"scrcpy exited with code {return_code}")
                 return False
             
             return True
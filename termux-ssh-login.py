@@ -25,11 +25,14 @@ Examples:
 
 import os
 import sys
+import shutil
 import subprocess
 import argparse
 import logging
 from pathlib import Path
-from typing import Dict, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
+
+from config_utils import parse_kv_config
 
 # Configure logging
 logging.basicConfig(
@@ -38,19 +41,38 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# OpenSSH client tools, looked up on PATH once instead of spawning them to test
+_HAS_SSH = shutil.which('ssh') is not None
+_HAS_SSH_COPY_ID = shutil.which('ssh-copy-id') is not None
+
 class TermuxSSHClient:
     """SSH client for connecting to Termux on Android devices."""
     
+    # Parsed config files, keyed by (path, mtime_ns, size)
+    _config_cache: Dict[Tuple[str, int, int], Dict[str, str]] = {}
+    
+    # OpenSSH connection multiplexing: the first ssh call does the full handshake
+    # and leaves a master connection behind for 60s; later calls reattach to its
+    # socket instead of opening a new TCP connection
+    SSH_MUX_OPTIONS = [
+        '-o', 'ControlMaster=auto',
+        '-o', 'ControlPersist=60',
+        '-o', 'ControlPath=~/.ssh/cm-%r@%h:%p',
+    ]
+    
     def __init__(self, config_file: str = "termux-user.txt"):
         self.script_dir = Path(__file__).parent.resolve()
         self.config_file = self.script_dir / config_file
         self.config = {}
+        self._ssh_base: List[str] = []
         
     def read_config(self) -> bool:
         """Read server configuration from termux-user.txt."""
-        logger.info(f"Reading configuration from: {self.config_file}")
+        logger.debug("Reading configuration from: %s", self.config_file)
         
-        if not self.config_file.exists():
+        try:
+            st = self.config_file.stat()
+        except FileNotFoundError:
             logger.error(f"Configuration file not found: {self.config_file}")
             logger.info("Please create termux-user.txt with the following format:")
             logger.info("  host=your_termux_host")
@@ -59,29 +81,14 @@ class TermuxSSHClient:
             return False
         
         try:
-            with open(self.config_file, 'r') as f:
-                for line_num, line in enumerate(f, 1):
-                    line = line.strip()
-                    
-                    # Skip comments and empty lines
-                    if not line or line.startswith('#'):
-                        continue
-                    
-                    # Parse key=value pairs
-                    if '=' in line:
-                        key, value = line.split('=', 1)
-                        key = key.strip()
-                        value = value.strip()
-                        
-                        # Remove quotes if present
-                        if value.startswith('"') and value.endswith('"'):
-                            value = value[1:-1]
-                        elif value.startswith("'") and value.endswith("'"):
-                            value = value[1:-1]
-                        
-                        self.config[key] = value
-                    else:
-                        logger.warning(f"Invalid line {line_num}: {line}")
+            # Reuse the parsed values while the file is unchanged
+            cache_key = (str(self.config_file), st.st_mtime_ns, st.st_size)
+            cached = TermuxSSHClient._config_cache.get(cache_key)
+            if cached is not None:
+                self.config = dict(cached)
+            else:
+                self._parse_config()
+                TermuxSSHClient._config_cache[cache_key] = dict(self.config)
             
             # Validate required fields
             required_fields = ['host', 'port', 'user']
@@ -91,10 +98,15 @@ class TermuxSSHClient:
                 logger.error(f"Missing required fields: {', '.join(missing_fields)}")
                 return False
             
+            # Build the ssh argv prefix once for all later calls; ControlPath lives in ~/.ssh
+            (Path.home() / '.ssh').mkdir(mode=0o700, exist_ok=True)
+            self._ssh_base = ['ssh', *self.SSH_MUX_OPTIONS, '-p', self.config['port'],
+                              f"{self.config['user']}@{self.config['host']}"]
+            
             logger.info("Configuration loaded successfully")
-            logger.info(f"Host: {self.config['host']}")
-            logger.info(f"Port: {self.config['port']}")
-            logger.info(f"User: {self.config['user']}")
+            logger.debug("Host: %s", self.config['host'])
+            logger.debug("Port: %s", self.config['port'])
+            logger.debug("User: %s", self.config['user'])
             
             return True
             
@@ -102,18 +114,24 @@ class TermuxSSHClient:
             logger.error(f"Error reading configuration file: {e}")
             return False
     
+    def _parse_config(self):
+        """Parse key=value lines from the config file into self.config in one regex pass."""
+        self.config.update(parse_kv_config(
+            self.config_file.read_text(),
+            on_invalid=lambda line_num, line: logger.warning(f"Invalid line {line_num}: {line}"),
+        ))
+    
     def check_ssh_client(self) -> bool:
         """Check if SSH client is available."""
         logger.info("Checking SSH client availability...")
         
-        # Check if ssh command is available
-        try:
-            result = subprocess.run(['ssh', '-V'], capture_output=True, text=True)
-            if result.returncode == 0:
-                logger.info(f"SSH client found: {result.stderr.strip()}")
-                return True
-        except FileNotFoundError:
-            pass
+        # Check if ssh command is available; only run it for the version string when verbose
+        if _HAS_SSH:
+            if logger.isEnabledFor(logging.DEBUG):
+                result = subprocess.run(['ssh', '-V'], capture_output=True, text=True)
+                logger.debug(f"SSH client version: {result.stderr.strip()}")
+            logger.info("SSH client found")
+            return True
         
         logger.error("SSH client not found!")
         logger.info("Please install OpenSSH client:")
@@ -127,14 +145,9 @@ class TermuxSSHClient:
         """Connect to Termux with interactive shell."""
         logger.info("Connecting to Termux with interactive shell...")
         
-        host = self.config['host']
-        port = self.config['port']
-        user = self.config['user']
-        
-        # Build SSH command
-        ssh_cmd = ['ssh', '-p', port, f'{user}@{host}']
+        ssh_cmd = self._ssh_base
         
-        logger.info(f"SSH command: {' '.join(ssh_cmd)}")
+        logger.debug("SSH command: %s", ssh_cmd)
         logger.info("Connecting... (use 'exit' to disconnect)")
         
         try:
@@ -150,19 +163,14 @@ class TermuxSSHClient:
     
     def execute_command(self, command: str) -> Tuple[bool, Optional[str]]:
         """Execute a command on the Termux server."""
-        logger.info(f"Executing command: {command}")
-        
-        host = self.config['host']
-        port = self.config['port']
-        user = self.config['user']
+        logger.debug("Executing command: %s", command)
         
-        # Build SSH command
-        ssh_cmd = ['ssh', '-p', port, f'{user}@{host}', command]
+        ssh_cmd = [*self._ssh_base, command]
         
         try:
             result = subprocess.run(ssh_cmd, capture_output=True, text=True, timeout=30)
             if result.returncode == 0:
-                logger.info("Command executed successfully")
+                logger.debug("Command executed successfully")
                 return True, result.stdout
             else:
                 logger.error(f"Command failed: {result.stderr}")
@@ -201,16 +209,7 @@ class TermuxSSHClient:
         user = self.config['user']
         
         # Check if ssh-copy-id is available
-        try:
-            result = subprocess.run(['ssh-copy-id', '-V'], capture_output=True, text=True)
-            if result.returncode != 0 and result.returncode != 1:
-                logger.error("ssh-copy-id not found!")
-                logger.info("Please install OpenSSH client:")
-                logger.info("  Ubuntu/Debian: sudo apt install openssh-client")
-                logger.info("  Arch Linux: sudo pacman -S openssh")
-                logger.info("  Fedora: sudo dnf install openssh-clients")
-                return False
-        except FileNotFoundError:
+        if not _HAS_SSH_COPY_ID:
             logger.error("ssh-copy-id not found!")
             logger.info("Please install OpenSSH client:")
             logger.info("  Ubuntu/Debian: sudo apt install openssh-client")
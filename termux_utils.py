@@ -12,9 +12,27 @@ Dependencies:
 - termux-user.txt file with SSH connection details
 """
 
+import atexit
+import functools
+import hashlib
+import io
+import logging
 import os
+import posixpath
+import select
+import shlex
+import shutil
+import socket
+import stat
 import subprocess
 import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple
+
+from config_utils import parse_kv_config
 try:
     import paramiko
 except ImportError:
@@ -22,31 +40,35 @@ except ImportError:
     print("Please install it with: pip install paramiko")
     raise
 
+logger = logging.getLogger(__name__)
+
 
 def read_termux_ssh_config():
-    """Read SSH connection details from termux-user.txt file."""
+    """Read SSH connection details from termux-user.txt file.
+    
+    The parsed result is cached until the file's mtime or size changes.
+    """
     termux_config_path = "/home/chenli/work/wine/termux-user.txt"
     
-    if not os.path.exists(termux_config_path):
+    try:
+        st = os.stat(termux_config_path)
+    except OSError:
         print(f"Error: termux-user.txt not found at {termux_config_path}")
         return None, None, None
     
+    return _parse_termux_ssh_config(termux_config_path, st.st_mtime_ns, st.st_size)
+
+
+@functools.lru_cache(maxsize=4)
+def _parse_termux_ssh_config(termux_config_path, mtime_ns, size):
+    """Parse termux-user.txt; mtime_ns and size only key the cache."""
     try:
         with open(termux_config_path, 'r') as f:
-            lines = f.readlines()
+            config = parse_kv_config(f.read())
         
-        host = None
-        port = 8022  # Default SSH port for Termux
-        user = None
-        
-        for line in lines:
-            line = line.strip()
-            if line.startswith('host='):
-                host = line.split('=', 1)[1]
-            elif line.startswith('port='):
-                port = int(line.split('=', 1)[1])
-            elif line.startswith('user='):
-                user = line.split('=', 1)[1]
+        host = config.get('host')
+        port = int(config.get('port', 8022))  # Default SSH port for Termux
+        user = config.get('user')
         
         if not host or not user:
             print("Error: Missing host or user in termux-user.txt")
@@ -58,51 +80,149 @@ def read_termux_ssh_config():
         return None, None, None
 
 
-def run_command(cmd, cwd=None, env=None, check=True):
-    """Run a shell command and return the result."""
+def run_command(cmd, cwd=None, env=None, check=True, capture=True):
+    """Run a command and return the result.
+
+    cmd is either an argv list, which is executed directly, or a string, which
+    is run through the shell. Pass capture=False when only the exit status matters: stdout is then
+    discarded instead of buffered, and only stderr is kept for error messages.
+    """
+    shown = cmd if isinstance(cmd, str) else shlex.join(map(str, cmd))
     try:
         result = subprocess.run(
-            cmd, shell=True, cwd=cwd, env=env, capture_output=True, text=True
+            cmd, shell=isinstance(cmd, str), cwd=cwd, env=env, text=True,
+            stdout=subprocess.PIPE if capture else subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
         )
         if check and result.returncode != 0:
-            print(f"Error running command: {cmd}")
+            print(f"Error running command: {shown}")
             print(f"Error output: {result.stderr}")
             return False, result
         return True, result
     except Exception as e:
-        print(f"Exception running command '{cmd}': {e}")
+        print(f"Exception running command '{shown}': {e}")
         return False, None
 
 
-def run_ssh_command(host, port, user, cmd, timeout=300):
-    """Run a command on Termux device via SSH."""
-    try:
+# Seconds between keepalive packets on pooled connections
+SSH_KEEPALIVE_INTERVAL = 30
+
+# Compress SSH traffic; command output and config payloads are mostly text
+SSH_COMPRESS = True
+
+# Ciphers to offer first: AES-GCM is hardware accelerated on both x86 and arm64
+# and saves the separate MAC pass of the CTR/CBC modes
+SSH_PREFERRED_CIPHERS = ("aes128-gcm@openssh.com", "aes256-gcm@openssh.com", "aes128-ctr")
+
+# The same preference for the scp command line tool, which also knows chacha20
+SCP_CIPHERS = "aes128-gcm@openssh.com,chacha20-poly1305@openssh.com,aes128-ctr"
+
+
+class _FastCipherTransport(paramiko.Transport):
+    """Transport that offers SSH_PREFERRED_CIPHERS ahead of paramiko's default order."""
+    _preferred_ciphers = tuple(c for c in SSH_PREFERRED_CIPHERS if c in paramiko.Transport._preferred_ciphers) + tuple(
+        c for c in paramiko.Transport._preferred_ciphers if c not in SSH_PREFERRED_CIPHERS
+    )
+
+
+# Open SSH connections, keyed by (host, port, user) and reused across calls
+_ssh_pool = {}
+
+# Open SFTP sessions, keyed like _ssh_pool and tied to the pooled connection
+_sftp_pool = {}
+
+# Guards both pools: parallel helpers look up connections from worker threads
+_pool_lock = threading.RLock()
+
+
+def _get_ssh_client(host, port, user):
+    """Return a connected SSH client for host, reusing a pooled connection if it is still alive."""
+    key = (host, port, user)
+    with _pool_lock:
+        ssh = _ssh_pool.get(key)
+        if ssh is not None:
+            transport = ssh.get_transport()
+            if transport is not None and transport.is_active():
+                return ssh
+            ssh.close()
+            del _ssh_pool[key]
+        
         # Create SSH client
         ssh = paramiko.SSHClient()
         ssh.set_missing_host_key_policy(paramiko.AutoAddPolicy())
         
-        # Connect to SSH server
-        print(f"Connecting to {user}@{host}:{port}...")
-        ssh.connect(host, port=port, username=user, timeout=30)
+        # Connect to SSH server. Disable Nagle before the handshake: the small
+        # request/reply packets of short commands otherwise stall on delayed ACKs.
+        logger.debug("Connecting to %s@%s:%s...", user, host, port)
+        sock = socket.create_connection((host, port), timeout=30)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        ssh.connect(host, port=port, username=user, timeout=30, sock=sock,
+                    compress=SSH_COMPRESS, transport_factory=_FastCipherTransport)
+        ssh.get_transport().set_keepalive(SSH_KEEPALIVE_INTERVAL)
+        _ssh_pool[key] = ssh
+        return ssh
+
+
+@atexit.register
+def close_ssh_connections():
+    """Close all pooled SSH connections."""
+    with _pool_lock:
+        _sftp_pool.clear()
+        while _ssh_pool:
+            _, ssh = _ssh_pool.popitem()
+            ssh.close()
+
+
+class SSHResult(NamedTuple):
+    """Result of a remote command, with the same attributes as subprocess.CompletedProcess."""
+    returncode: int
+    stdout: str
+    stderr: str
+
+
+# Bytes read from a channel per recv call
+SSH_RECV_SIZE = 1 << 16
+
+
+def _recv_all(channel, timeout):
+    """Read stdout and stderr of channel until both reach EOF, whichever has data first.
+
+    Draining both streams as data arrives keeps a chatty stderr from filling the
+    channel window while stdout is still being read. Returns the decoded
+    (stdout, stderr) pair; raises socket.timeout after timeout seconds.
+    """
+    out, err = [], []
+    deadline = time.monotonic() + timeout
+    while True:
+        if time.monotonic() > deadline:
+            raise socket.timeout(f"command still running after {timeout}s")
+        if channel.recv_ready():
+            out.append(channel.recv(SSH_RECV_SIZE))
+        elif channel.recv_stderr_ready():
+            err.append(channel.recv_stderr(SSH_RECV_SIZE))
+        elif channel.eof_received:
+            # EOF is only flagged after all data, but stderr may trail it in the buffer
+            if not (channel.recv_ready() or channel.recv_stderr_ready()):
+                break
+        else:
+            select.select([channel], [], [], 0.1)
+    return b"".join(out).decode('utf-8'), b"".join(err).decode('utf-8')
+
+
+def run_ssh_command(host, port, user, cmd, timeout=300):
+    """Run a command on Termux device via SSH, over a pooled connection."""
+    try:
+        ssh = _get_ssh_client(host, port, user)
         
         # Execute command
-        print(f"Executing command: {cmd}")
-        stdin, stdout, stderr = ssh.exec_command(cmd, timeout=timeout)
-        
-        # Get output
-        stdout_data = stdout.read().decode('utf-8')
-        stderr_data = stderr.read().decode('utf-8')
-        exit_code = stdout.channel.recv_exit_status()
-        
-        # Close connection
-        ssh.close()
-        
-        # Create a result object similar to subprocess.run
-        class SSHResult:
-            def __init__(self, returncode, stdout, stderr):
-                self.returncode = returncode
-                self.stdout = stdout
-                self.stderr = stderr
+        logger.debug("Executing command: %s", cmd)
+        channel = ssh.get_transport().open_session(timeout=timeout)
+        try:
+            channel.exec_command(cmd)
+            stdout_data, stderr_data = _recv_all(channel, timeout)
+            exit_code = channel.recv_exit_status()
+        finally:
+            channel.close()
         
         result = SSHResult(exit_code, stdout_data, stderr_data)
         
@@ -124,9 +244,129 @@ def run_ssh_command(host, port, user, cmd, timeout=300):
         return False, None
 
 
+def _get_sftp_client(host, port, user):
+    """Return an SFTP session on the pooled SSH connection for host."""
+    key = (host, port, user)
+    with _pool_lock:
+        ssh = _get_ssh_client(host, port, user)
+        cached = _sftp_pool.get(key)
+        if cached is not None and cached[0] is ssh:
+            return cached[1]
+        sftp = ssh.open_sftp()
+        _sftp_pool[key] = (ssh, sftp)
+        return sftp
+
+
+def _sftp_path(android_path):
+    """Translate a shell-style path for SFTP, which starts in the home directory but does not expand ~."""
+    if android_path == "~":
+        return "."
+    if android_path.startswith("~/"):
+        return android_path[2:]
+    return android_path
+
+
+def _sftp_is_dir(sftp, path):
+    """Check whether path is an existing directory on the SFTP server."""
+    try:
+        return stat.S_ISDIR(sftp.stat(path).st_mode)
+    except IOError:
+        return False
+
+
+def _scp_push(local_path, android_path, port, user, host, recursive=False):
+    """Upload with the scp command line tool; used when SFTP is unavailable."""
+    cmd = ["scp", *(["-r"] if recursive else []), "-C", "-c", SCP_CIPHERS, "-P", str(port),
+           str(local_path), f"{user}@{host}:{android_path}"]
+    success, result = run_command(cmd, check=False, capture=False)
+    if not success or result.returncode != 0:
+        if result is None:
+            print(f"Error pushing {local_path}: could not run scp")
+        else:
+            print(f"Error pushing {local_path}: scp exited with code {result.returncode}: {result.stderr.strip()}")
+        return False
+    return True
+
+
+def _sha256_file(path):
+    """Return the hex sha256 digest of a local file."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        while chunk := f.read(1 << 20):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _remote_sha256(host, port, user, cmd):
+    """Run a sha256sum command on the device and return its output as {path: digest}."""
+    success, result = run_ssh_command(host, port, user, f"{cmd}; true")
+    digests = {}
+    if result is not None:
+        for line in result.stdout.splitlines():
+            digest, sep, path = line.partition("  ")
+            if sep:
+                digests[path] = digest
+    return digests
+
+
+# Results of read-only remote queries, keyed by (query, normalized path), oldest first
+REMOTE_QUERY_CACHE_SIZE = 1024
+_remote_query_cache = {}
+
+
+def _cache_path(android_path):
+    """Normalize an Android path for use as a query cache key."""
+    return posixpath.normpath(_sftp_path(android_path))
+
+
+def invalidate_path(android_path=None):
+    """Drop cached query results for android_path, its parents and everything below it.
+
+    With no path, the whole cache is dropped.
+    """
+    if android_path is None:
+        _remote_query_cache.clear()
+        return
+    path = _cache_path(android_path)
+    for key in [key for key in _remote_query_cache if _paths_overlap(key[1], path)]:
+        del _remote_query_cache[key]
+
+
+def _paths_overlap(a, b):
+    """Check whether one of two normalized paths is, or contains, the other."""
+    if "." in (a, b) or a == b:
+        return True
+    return b.startswith(a.rstrip("/") + "/") or a.startswith(b.rstrip("/") + "/")
+
+
+def _cached_queries(kind, android_paths, query):
+    """Run query(uncached_paths) -> results for the paths not already cached under kind.
+
+    Returns the results for all android_paths in order.
+    """
+    keys = [(kind, _cache_path(path)) for path in android_paths]
+    # Take the hits first, so storing the fresh results cannot evict them
+    cached = {key: _remote_query_cache[key] for key in keys if key in _remote_query_cache}
+    missing = [path for path, key in zip(android_paths, keys) if key not in cached]
+    fresh = dict(zip(missing, query(missing))) if missing else {}
+    for path, key in zip(android_paths, keys):
+        if key not in cached:
+            if len(_remote_query_cache) >= REMOTE_QUERY_CACHE_SIZE:
+                del _remote_query_cache[next(iter(_remote_query_cache))]
+            _remote_query_cache[key] = fresh[path]
+    return [cached[key] if key in cached else fresh[path] for path, key in zip(android_paths, keys)]
+
+
+def _sftp_put(sftp, local_path, remote_path):
+    """Upload a file over SFTP and give it the local file's permissions, as scp does."""
+    sftp.put(local_path, remote_path)
+    sftp.chmod(remote_path, os.stat(local_path).st_mode & 0o7777)
+
+
 def push_file_to_android(local_path, android_path):
-    """Push a file to Android device via SCP."""
-    print(f"Pushing {local_path} to {android_path}")
+    """Push a file to Android device via SFTP over the pooled SSH connection."""
+    logger.debug("Pushing %s to %s", local_path, android_path)
+    invalidate_path(android_path)
     
     # Read SSH connection details
     host, port, user = read_termux_ssh_config()
@@ -134,18 +374,43 @@ def push_file_to_android(local_path, android_path):
         print("Failed to read SSH connection details from termux-user.txt")
         return False
     
-    # Use SCP to transfer the file
-    cmd = f"scp -P {port} {local_path} {user}@{host}:{android_path}"
-    success, result = run_command(cmd, check=False)
-    if not success:
-        print(f"Error pushing file: {result.stderr if result else 'Unknown error'}")
-        return False
-    return True
+    try:
+        sftp = _get_sftp_client(host, port, user)
+        remote_path = _sftp_path(android_path)
+        # Like scp, copy into the target when it is a directory
+        if _sftp_is_dir(sftp, remote_path):
+            remote_path = posixpath.join(remote_path, os.path.basename(local_path))
+        # Skip the upload when the device already has identical content
+        remote_digests = _remote_sha256(host, port, user, f"sha256sum -- {shlex.quote(remote_path)} 2>/dev/null")
+        if remote_digests.get(remote_path) == _sha256_file(local_path):
+            logger.debug("%s is up to date, skipping upload", android_path)
+            return True
+        _sftp_put(sftp, local_path, remote_path)
+        return True
+    except Exception as e:
+        print(f"SFTP upload failed ({e}), falling back to scp")
+    return _scp_push(local_path, android_path, port, user, host)
+
+
+# Parallel SFTP channels used by push_directory_to_android
+SFTP_UPLOAD_WORKERS = 8
+
+
+def _upload_files(sftp, uploads):
+    """Upload (local, remote, remote_digest) entries over one SFTP channel; returns how many were unchanged."""
+    skipped = 0
+    for local_file, remote_file, remote_digest in uploads:
+        if remote_digest is not None and remote_digest == _sha256_file(local_file):
+            skipped += 1
+            continue
+        _sftp_put(sftp, local_file, remote_file)
+    return skipped
 
 
 def push_directory_to_android(local_path, android_path):
-    """Push a directory to Android device via SCP recursively."""
-    print(f"Pushing directory {local_path} to {android_path}")
+    """Push a directory to Android device recursively via SFTP over the pooled SSH connection."""
+    logger.debug("Pushing directory %s to %s", local_path, android_path)
+    invalidate_path(android_path)
     
     # Read SSH connection details
     host, port, user = read_termux_ssh_config()
@@ -153,25 +418,179 @@ def push_directory_to_android(local_path, android_path):
         print("Failed to read SSH connection details from termux-user.txt")
         return False
     
-    # Use SCP with recursive flag to transfer the directory
-    cmd = f"scp -r -P {port} {local_path} {user}@{host}:{android_path}"
-    success, result = run_command(cmd, check=False)
-    if not success:
-        print(f"Error pushing directory: {result.stderr if result else 'Unknown error'}")
-        return False
-    return True
+    try:
+        sftp = _get_sftp_client(host, port, user)
+        remote_root = _sftp_path(android_path)
+        # Like scp -r, copy into the target when it already exists
+        if _sftp_is_dir(sftp, remote_root):
+            remote_root = posixpath.join(remote_root, os.path.basename(os.path.normpath(local_path)))
+        
+        # Hash the whole remote tree in one exec; unchanged files are skipped
+        remote_digests = _remote_sha256(
+            host, port, user,
+            f"cd {shlex.quote(remote_root)} 2>/dev/null && find . -type f -exec sha256sum {{}} +",
+        )
+        
+        remote_dirs = []
+        uploads = []
+        for dirpath, _, filenames in os.walk(local_path):
+            rel = os.path.relpath(dirpath, local_path)
+            rel_parts = [] if rel == "." else rel.split(os.sep)
+            remote_dir = posixpath.join(remote_root, *rel_parts)
+            remote_dirs.append(remote_dir)
+            uploads += [
+                (os.path.join(dirpath, filename), posixpath.join(remote_dir, filename),
+                 remote_digests.get(posixpath.join(".", *rel_parts, filename)))
+                for filename in filenames
+            ]
+        
+        # Create the whole remote tree with one mkdir instead of an SFTP round-trip per directory
+        mkdir_cmd = "mkdir -p -- " + " ".join(shlex.quote(d) for d in remote_dirs)
+        success, _ = run_ssh_command(host, port, user, mkdir_cmd)
+        if not success:
+            raise IOError(f"could not create {remote_root}")
+        
+        # Upload on several SFTP channels of the pooled connection at once; each
+        # worker gets its own channel and a share of the files
+        workers = min(SFTP_UPLOAD_WORKERS, len(uploads))
+        channels = [sftp] + [_get_ssh_client(host, port, user).open_sftp() for _ in range(workers - 1)]
+        try:
+            with ThreadPoolExecutor(max_workers=max(workers, 1)) as executor:
+                skipped = sum(executor.map(_upload_files, channels, [uploads[i::workers] for i in range(workers)]))
+        finally:
+            for channel in channels[1:]:
+                channel.close()
+        
+        if skipped:
+            logger.debug("Skipped %d unchanged file(s)", skipped)
+        return True
+    except Exception as e:
+        print(f"SFTP upload failed ({e}), falling back to scp")
+    return _scp_push(local_path, android_path, port, user, host, recursive=True)
 
 
 def execute_ssh_command(cmd, timeout=300):
-    """Execute a command on Termux device via SSH using config from termux-user.txt."""
+    """Execute a command on Termux device via SSH using config from termux-user.txt.
+
+    The command may change any remote path, so cached query results are dropped.
+    """
     host, port, user = read_termux_ssh_config()
     if not host or not user:
         print("Failed to read SSH connection details from termux-user.txt")
         return False, None
     
+    invalidate_path()
     return run_ssh_command(host, port, user, cmd, timeout)
 
 
+def _ssh_query(cmd, timeout=300):
+    """Run a read-only command on Termux device; unlike execute_ssh_command, keeps cached query results."""
+    host, port, user = read_termux_ssh_config()
+    if not host or not user:
+        print("Failed to read SSH connection details from termux-user.txt")
+        return False, None
+    
+    return run_ssh_command(host, port, user, cmd, timeout)
+
+
+def execute_ssh_batch(cmds, timeout=300):
+    """Execute several commands on Termux device in one SSH exec.
+
+    The commands run in order in a single remote shell, each one regardless of
+    whether the previous one failed. Returns a list with one (success, stdout)
+    tuple per command.
+    """
+    return _ssh_batch(cmds, timeout, execute_ssh_command)
+
+
+def _ssh_batch(cmds, timeout, execute):
+    """Run cmds in one exec through execute (execute_ssh_command or _ssh_query); see execute_ssh_batch."""
+    if not cmds:
+        return []
+    
+    # Follow each command with a marker line carrying its exit status
+    marker = f"__RC_{uuid.uuid4().hex}__"
+    script = "".join(f'{cmd}\necho "{marker}$?"\n' for cmd in cmds)
+    success, result = execute(script, timeout)
+    if result is None:
+        return [(False, "")] * len(cmds)
+    
+    results = []
+    output = []
+    for line in result.stdout.splitlines(keepends=True):
+        pos = line.find(marker)
+        if pos < 0:
+            output.append(line)
+            continue
+        output.append(line[:pos])
+        results.append((line[pos + len(marker):].strip() == "0", "".join(output)))
+        output = []
+    
+    # Commands after an `exit` never reported a status
+    results += [(False, "")] * (len(cmds) - len(results))
+    return results
+
+
+# Concurrent exec channels used by execute_ssh_parallel; sshd allows 10 sessions per connection by default
+SSH_PARALLEL_CHANNELS = 8
+
+
+def execute_ssh_parallel(cmds, timeout=300):
+    """Execute independent commands on Termux device concurrently.
+
+    Each command runs on its own channel of the pooled SSH connection, so slow
+    commands overlap instead of queueing. Returns a list with one
+    (success, stdout) tuple per command, in the order given.
+    """
+    if not cmds:
+        return []
+    
+    def run(cmd):
+        success, result = execute_ssh_command(cmd, timeout)
+        return success, result.stdout if result else ""
+    
+    with ThreadPoolExecutor(max_workers=min(SSH_PARALLEL_CHANNELS, len(cmds))) as executor:
+        return list(executor.map(run, cmds))
+
+
+class SSHBatch:
+    """Collect commands and run them in one SSH exec when the with-block exits.
+
+        with ssh_batch() as batch:
+            batch.add("mkdir -p ~/bin")
+            batch.add("chmod +x ~/bin/tool")
+        ok = all(success for success, _ in batch.results)
+    """
+    
+    def __init__(self, timeout=300):
+        self.timeout = timeout
+        self.cmds = []
+        self.results = []
+    
+    def add(self, cmd):
+        self.cmds.append(cmd)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.results = execute_ssh_batch(self.cmds, self.timeout)
+        return False
+
+
+def ssh_batch(timeout=300):
+    """Return an SSHBatch to use as a context manager."""
+    return SSHBatch(timeout)
+
+
+def _path_args(android_paths):
+    """Join one path or a list of paths into shell arguments."""
+    if isinstance(android_paths, str):
+        return android_paths
+    return " ".join(android_paths)
+
+
 def create_temp_file(content, suffix="", prefix="tmp"):
     """Create a temporary file with the given content and return its path."""
     with tempfile.NamedTemporaryFile(mode='w', suffix=suffix, prefix=prefix, delete=False) as tmp_file:
@@ -180,14 +599,33 @@ def create_temp_file(content, suffix="", prefix="tmp"):
 
 
 def push_content_to_android(content, android_path, suffix="", prefix="tmp"):
-    """Create a temporary file with content and push it to Android device."""
+    """Push content (str or bytes) to a file on Android device.
+    
+    The content is uploaded from memory over SFTP; suffix and prefix only name
+    the temporary file used by the scp fallback.
+    """
+    host, port, user = read_termux_ssh_config()
+    if not host or not user:
+        print("Failed to read SSH connection details from termux-user.txt")
+        return False
+    
+    invalidate_path(android_path)
+    data = content.encode() if isinstance(content, str) else content
+    try:
+        sftp = _get_sftp_client(host, port, user)
+        sftp.putfo(io.BytesIO(data), _sftp_path(android_path), file_size=len(data))
+        return True
+    except Exception as e:
+        print(f"SFTP upload failed ({e}), falling back to scp")
+    
     # Create temporary file
-    tmp_path = create_temp_file(content, suffix, prefix)
+    with tempfile.NamedTemporaryFile(suffix=suffix, prefix=prefix, delete=False) as tmp_file:
+        tmp_file.write(data)
+        tmp_path = tmp_file.name
     
     try:
         # Push to Android
-        success = push_file_to_android(tmp_path, android_path)
-        return success
+        return _scp_push(tmp_path, android_path, port, user, host)
     finally:
         # Clean up temporary file
         if os.path.exists(tmp_path):
@@ -195,8 +633,8 @@ def push_content_to_android(content, android_path, suffix="", prefix="tmp"):
 
 
 def make_executable_on_android(android_path):
-    """Make a file executable on Android device via SSH."""
-    cmd = f"chmod +x {android_path}"
+    """Make a file (or a list of files, in one call) executable on Android device via SSH."""
+    cmd = f"chmod +x {_path_args(android_path)}"
     success, result = execute_ssh_command(cmd)
     if not success:
         print(f"Failed to make file executable: {result.stderr if result else 'Unknown error'}")
@@ -205,8 +643,8 @@ def make_executable_on_android(android_path):
 
 
 def create_directory_on_android(android_path):
-    """Create a directory on Android device via SSH."""
-    cmd = f"mkdir -p {android_path}"
+    """Create a directory (or a list of directories, in one call) on Android device via SSH."""
+    cmd = f"mkdir -p {_path_args(android_path)}"
     success, result = execute_ssh_command(cmd)
     if not success:
         print(f"Failed to create directory: {result.stderr if result else 'Unknown error'}")
@@ -214,31 +652,116 @@ def create_directory_on_android(android_path):
     return True
 
 
+def _sftp_check_mode(android_path, is_type):
+    """Stat one path or a list of paths over the pooled SFTP session and test the mode with is_type.
+
+    Returns None when no SFTP session could be opened, so the caller can fall back to the shell.
+    """
+    host, port, user = read_termux_ssh_config()
+    if not host or not user:
+        return None
+    try:
+        sftp = _get_sftp_client(host, port, user)
+    except Exception:
+        return None
+    
+    def check(path):
+        try:
+            return is_type(sftp.stat(_sftp_path(path)).st_mode)
+        except IOError:
+            return False
+    
+    if isinstance(android_path, str):
+        return check(android_path)
+    return [check(path) for path in android_path]
+
+
+def _check_exists(android_path, is_type, test_flag):
+    """Check one path or a list of paths for is_type, via SFTP stat or a shell test as fallback."""
+    def query(paths):
+        exists = _sftp_check_mode(paths, is_type)
+        if exists is not None:
+            return exists
+        return [success for success, _ in _ssh_batch([f"test -{test_flag} {p}" for p in paths], 300, _ssh_query)]
+    
+    if isinstance(android_path, str):
+        return _cached_queries(test_flag, [android_path], query)[0]
+    return _cached_queries(test_flag, list(android_path), query)
+
+
 def check_file_exists_on_android(android_path):
-    """Check if a file exists on Android device via SSH."""
-    cmd = f"test -f {android_path}"
-    success, result = execute_ssh_command(cmd)
-    return success
+    """Check if a file exists on Android device, with an SFTP stat instead of a remote shell.
+    
+    Given a list of paths, checks them all and returns a list of bools. Results
+    are cached until the path is pushed to or a remote command is run.
+    """
+    return _check_exists(android_path, stat.S_ISREG, "f")
 
 
 def check_directory_exists_on_android(android_path):
-    """Check if a directory exists on Android device via SSH."""
-    cmd = f"test -d {android_path}"
-    success, result = execute_ssh_command(cmd)
-    return success
+    """Check if a directory exists on Android device, with an SFTP stat instead of a remote shell.
+    
+    Given a list of paths, checks them all and returns a list of bools. Results
+    are cached until the path is pushed to or a remote command is run.
+    """
+    return _check_exists(android_path, stat.S_ISDIR, "d")
 
 
 def get_file_info_on_android(android_path):
-    """Get file information on Android device via SSH."""
-    cmd = f"ls -la {android_path}"
-    success, result = execute_ssh_command(cmd)
-    if not success:
-        return None
-    return result.stdout.strip()
+    """Get file information on Android device via SSH, cached like the exists checks."""
+    def query(paths):
+        success, result = _ssh_query(f"ls -la {paths[0]}")
+        return [result.stdout.strip() if success else None]
+    
+    return _cached_queries("ls", [android_path], query)[0]
 
 
 def download_and_push_to_android(url, android_path, timeout=300):
-    """Download a file from URL and push it to Android device."""
+    """Download a file from URL and push it to Android device.
+    
+    The response body is streamed straight into an SFTP upload on the pooled
+    connection, without a local temporary file. If that fails, the download is
+    retried through a local temporary file.
+    """
+    import urllib.request
+    
+    # Read SSH connection details
+    host, port, user = read_termux_ssh_config()
+    if not host or not user:
+        print("Failed to read SSH connection details from termux-user.txt")
+        return False
+    
+    invalidate_path(android_path)
+    try:
+        sftp = _get_sftp_client(host, port, user)
+    except Exception as e:
+        print(f"SFTP unavailable ({e}), downloading to a temporary file")
+        return _download_then_push(url, android_path)
+    
+    # Stream into a temporary name and rename it into place only once complete,
+    # so a failed or truncated download never leaves a partial file behind
+    remote_path = _sftp_path(android_path)
+    part_path = f"{remote_path}.part-{uuid.uuid4().hex[:8]}"
+    try:
+        logger.debug("Downloading %s...", url)
+        with urllib.request.urlopen(url, timeout=timeout) as resp:
+            expected = int(resp.headers.get('Content-Length') or 0)
+            attrs = sftp.putfo(resp, part_path, file_size=expected)
+        if expected and attrs.st_size != expected:
+            raise IOError(f"truncated download: got {attrs.st_size} of {expected} bytes")
+        sftp.posix_rename(part_path, remote_path)
+        return True
+    except Exception as e:
+        try:
+            sftp.remove(part_path)
+        except IOError:
+            pass
+        print(f"Streaming {url} failed ({e}), downloading to a temporary file")
+    return _download_then_push(url, android_path)
+
+
+def _download_then_push(url, android_path):
+    """Download url to a temporary file, then push it; used when SFTP is unavailable."""
     import urllib.request
     
     # Download to temporary location
@@ -246,8 +769,10 @@ def download_and_push_to_android(url, android_path, timeout=300):
         tmp_path = tmp_file.name
     
     try:
-        print(f"Downloading {url}...")
-        urllib.request.urlretrieve(url, tmp_path)
+        logger.debug("Downloading %s...", url)
+        # Stream into the open temp file in large blocks rather than urlretrieve's 8 KiB reads
+        with urllib.request.urlopen(url) as resp, open(tmp_path, 'wb') as f:
+            shutil.copyfileobj(resp, f, length=1 << 20)
         
         # Push to Android
         success = push_file_to_android(tmp_path, android_path)